@@ -15,6 +15,7 @@ __version__ = 1.0
 
 import os
 import csv
+import argparse
 import json
 import collections
 import socket, struct
@@ -37,23 +38,51 @@ import urllib3
 import requests
 from tqdm import tqdm
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
-from csv_diff import load_csv, compare
+from nexpose_client import NexposeClient, POOL_SIZE, TIMEOUT, PAGE_SIZE, CONCURRENCY
+from task_graph import TaskGraph
+from records import RecordBuilder
+from response_cache import ResponseCache, CACHE_PATH
+from journal import Journal, journal_path
+from snapshots import (DATA_DIR, FORMATS, write_snapshot, latest_snapshot, load_snapshot, load_summaries, load_fetched,
+                       site_summary)
 
 #Disable certificate warnings
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
+MAX_CARRY_DAYS = 7 # Days a site's schedules/credentials may be carried forward before an incremental run refetches them.
+
 class Main: # Class stores all needed Nexpose data as class attributes to then be used in various API calls.
     def __init__(self, host=None, auth=None, site_IDs=None, scanEngine_IDs=[], siteInfo=None,
                  scanSchedules=None, siteCreds=None, scanTemplates=None, scanEngines=None, enginePools=None,
-                 users=None, console=None): 
+                 users=None, console=None, pool_size=POOL_SIZE, timeout=TIMEOUT,
+                 page_size=PAGE_SIZE, concurrency=CONCURRENCY, cache_path=None, offline=False, incremental=False,
+                 snapshot_formats=('parquet',), resume=False, max_carry_days=MAX_CARRY_DAYS): 
         ''' 
         > Fucntion: instantiates the class (class constructor).
-        > Input: user's Nexpose API credentials and API host to connect to. 
+        > Input: user's Nexpose API credentials, API host to connect to, HTTP pool size/timeouts/page size,
+                 how many per-site requests may run at once, an optional on-disk response cache file,
+                 whether to serve everything from that cache (offline mode), whether to only refetch
+                 new/modified sites compared to the previous snapshot (incremental mode), which file
+                 formats ('parquet' and/or 'csv') snapshots are saved in, whether per-site fetches
+                 already recorded in the run journal are reused (resume) and how many days incremental
+                 runs may carry a site's data forward before refetching it. 
 
         '''
         # Nexpose configs:
         self.auth = auth # Stores encoded user credentials.
         self.host = host # Stores selected host URL.
+        self.concurrency = concurrency # Stores max number of per-site requests in flight at once.
+        self.incremental = incremental # Stores whether only new/modified sites are refetched.
+        self.max_carry_days = max_carry_days # Stores max age (days) of carried forward site data.
+        self.snapshot_formats = snapshot_formats # Stores snapshot file formats.
+        self.resume = resume # Stores whether per-site fetches finished by an interrupted run are reused.
+        self.journal = None # Stores the run journal of per-site fetches (opened by 'loader').
+        # Incremental sync:
+        self.site_documents = {} # Stores {site ID : '/sites' listing entry}.
+        self.site_summaries = {} # Stores {site ID : summary hash of its listing entry}.
+        self.changed_site_IDs = None # Stores IDs of new/modified sites (None means every site is fetched).
+        self.site_fetched = {} # Stores {site ID : date its carried forward data was fetched ('YYYY-MM-DD')}.
+        self.previous = {} # Stores the previous snapshot's {dataset name : dataframe}.
         # DataFrames:
         self.siteInfo = siteInfo
         self.scanSchedules = scanSchedules
@@ -88,9 +117,15 @@ class Main: # Class stores all needed Nexpose data as class attributes to then b
             user = input("username: ")
             passw = b64e(getpass("password: ").encode()) # Encodes user password to not store it as clear text.
             self.auth = (user, passw) # Saves user credentials as a Nexpose class attributes (as a tuple).
-            self.test_connection() # Tests your NEXPOSE credentials by testing them with your provided host. 
         else:
             self.auth = auth
+        if offline and cache_path is None:
+            cache_path = CACHE_PATH
+        cache = ResponseCache(cache_path) if cache_path else None # Optional on-disk response cache.
+        self.client = NexposeClient(self.host, self.auth, pool_size=max(pool_size, concurrency), timeout=timeout,
+                                    page_size=page_size, cache=cache, offline=offline) # Shared pooled HTTP client.
+        if auth == None and not offline:
+            self.test_connection() # Tests your NEXPOSE credentials by testing them with your provided host. 
            
     def get_auth(self):
         ''' 
@@ -104,8 +139,7 @@ class Main: # Class stores all needed Nexpose data as class attributes to then b
         > Fucntion: tests whether user credentials are correct or not by establishing a connection to the API server.
 
         '''
-        url = f"{self.host}/sites"
-        response = requests.get(url, auth=(self.auth[0],b64d(self.auth[1]).decode()), params={'page':0, 'size':1}, verify=False)
+        response = self.client.get("/sites", params={'page':0, 'size':1})
         try:
             response.raise_for_status()
         except:
@@ -118,123 +152,220 @@ class Main: # Class stores all needed Nexpose data as class attributes to then b
         '''
         print ("Getting all site IDs..") # Status update
         
-        host = self.host
-        url = f"{host}/sites" # Nexspose API databse URL (Assigns which part to access of the DB).
-        response = requests.get(url, auth=self.get_auth(), params={'page':0, 'size':500}, verify=False)
-        response.raise_for_status() # Reports back errors/issues.
-        IDs = [x['id'] for x in response.json()['resources']] # Navigating through the output to get site IDs.
+        sites = list(self.client.iter_resources("/sites")) # Walks every page of sites.
+        IDs = [x['id'] for x in sites] # Navigating through the output to get site IDs.
         self.site_IDs = IDs # Saving as a class attribute
+        self.site_documents = {x['id']: x for x in sites}
+        self.site_summaries = {x['id']: site_summary(x) for x in sites} # Lightweight per-site change markers.
+
+    def plan_sync(self):
+        ''' 
+        > Fucntion: Compares site summaries against the previous snapshot and stores which sites are new or modified.
+                    Falls back to fetching every site when there is no usable previous snapshot. Changes that don't
+                    show in the '/sites' listing (edited scan schedules or shared credentials) aren't detected, so
+                    sites whose data was last fetched 'max_carry_days' or more days ago are refetched as well.
+
+        '''
+        previous_path = latest_snapshot(DATA_DIR, require_summaries=True)
+        if previous_path is None:
+            print('No previous snapshot found, fetching every site..')
+            return
+        previous = load_snapshot(previous_path)
+        if not all(name in previous for name in ('siteInfo', 'scanSchedules', 'siteCreds')):
+            print(f'Previous snapshot {previous_path} is incomplete, fetching every site..')
+            return
+        old_summaries = load_summaries(previous_path)
+        fetched = load_fetched(previous_path)
+        today = date.today()
+        self.previous = previous
+        modified = {s_ID for s_ID in self.site_IDs if old_summaries.get(s_ID) != self.site_summaries[s_ID]}
+        expired = {s_ID for s_ID in self.site_IDs if s_ID not in modified and
+                   (today - date.fromisoformat(fetched.get(s_ID, '0001-01-01'))).days >= self.max_carry_days}
+        refetched = modified | expired
+        self.changed_site_IDs = [s_ID for s_ID in self.site_IDs if s_ID in refetched] # Keeps site listing order
+        self.site_fetched = {s_ID: fetched[s_ID] for s_ID in self.site_IDs if s_ID not in refetched}
+        print(f'Incremental sync against {previous_path}: {len(modified)} new/modified site(s), {len(expired)} '
+              f'refetched after {self.max_carry_days} day(s), {len(self.site_IDs) - len(refetched)} carried forward.')
+
+    def sites_to_fetch(self):
+        ''' 
+        > Fucntion: Returns the site IDs whose detail endpoints need fetching (all sites unless syncing incrementally).
+
+        '''
+        return self.site_IDs if self.changed_site_IDs is None else self.changed_site_IDs
+
+    def carry_forward(self, name, dataframe):
+        ''' 
+        > Fucntion: Adds the previous snapshot's rows of unchanged sites to a freshly fetched dataset,
+                    keeping rows in site listing order. Sites no longer listed are dropped.
+
+        '''
+        if self.changed_site_IDs is None:
+            return dataframe
+        changed = set(self.changed_site_IDs)
+        previous = self.previous[name]
+        kept = previous[previous['Site ID'].isin([s for s in self.site_IDs if s not in changed])]
+        combined = pd.concat([dataframe, kept], ignore_index=True) if len(dataframe) else kept
+        order = {s_ID: i for i, s_ID in enumerate(self.site_IDs)}
+        return combined.sort_values('Site ID', key=lambda c: c.map(order), kind='stable').reset_index(drop=True)
+
+    def site_document(self, s_ID):
+        ''' 
+        > Fucntion: Returns a site's document, reusing its '/sites' listing entry when syncing incrementally.
+
+        '''
+        if self.incremental and s_ID in self.site_documents:
+            return self.site_documents[s_ID]
+        return self.client.get_json(f"/sites/{s_ID}") # Site document API call (memoized)
     
+    def journaled(self, name, fetch):
+        ''' 
+        > Fucntion: Wraps a per-site fetch so each finished site is appended to the run journal with its result,
+                    and sites already in the journal (resumed run) return their recorded result without an API call.
+
+        '''
+        if self.journal is None:
+            return fetch
+
+        def run(s_ID):
+            unit = f'{name}:{s_ID}'
+            if self.journal.done(unit):
+                return self.journal.result(unit)
+            result = fetch(s_ID)
+            self.journal.record(unit, result=result)
+            return result
+        return run
+
+    def fetch_siteInfo(self, s_ID):
+        ''' 
+        > Fucntion: Gets site defaults for one site (one API call), returns a 'data' dict or None if the site lacks them.
+
+        '''
+        site = self.site_document(s_ID) # Site document (memoized, shared with 'fetch_siteCreds')
+        # Creating a dictionary that stores data sorted by site ID
+        try:
+            return {'Site ID':s_ID,
+                    'Number of Assets':site['assets'],
+                    'Site Name':site['name'],
+                    'Default Scan Engine':site['scanEngine'],
+                    'Default Template':site['scanTemplate'],
+                    'Site Type':site['type']}
+        except:
+            return None
+
     def get_siteInfo(self):
         ''' 
         > Fucntion: Gets and stores API data for site defaults (default template, scan engine, etc..
+                    Sites are fetched concurrently (up to 'self.concurrency' at once) and kept in site ID order.
 
         '''
         print('Getting site specific info data..') # Status update
         
-        dataframe = pd.DataFrame()
-        for s_ID in self.site_IDs: 
-            response = requests.get(self.host + f"/sites/{s_ID}",
-                                    auth=self.get_auth(), params={'size':500}, verify=False) # Site alerts API call
-
-            # Creating a dictionary that stores data sorted by site ID
-            try:
-                data = {'Site ID':s_ID,
-                        'Number of Assets':(response.json()['assets']),
-                        'Site Name':(response.json()['name']),
-                        'Default Scan Engine':(response.json()['scanEngine']),
-                        'Default Template':(response.json()['scanTemplate']),
-                        'Site Type':(response.json()['type'])}
-            except:
-                pass
-            # Saving data in a dataframe format
-            dataframe = dataframe.append(data, ignore_index = True)
-            dataframe = dataframe.replace(np.nan,'',regex=True) # Replaces all NaN/Null values with an empty string.
+        records = RecordBuilder()
+        for data in self.client.fan_out(self.journaled('siteInfo', self.fetch_siteInfo), self.site_IDs,
+                                        workers=self.concurrency):
+            if data is None:
+                continue
+            records.append(data) # Collecting data in column buffers
         convert = {'Site ID': int,
                    'Number of Assets': int}
-        dataframe = dataframe.astype(convert)
+        dataframe = records.build(convert) # Builds the dataframe once, replacing all NaN/Null values with an empty string.
         dataframe.sort_values(by=['Site ID'])
         self.siteInfo = dataframe # Saving as a class attribute.
         self.siteInfo.drop_duplicates(keep=False)
+
+    def fetch_scanSchedules(self, s_ID):
+        ''' 
+        > Fucntion: Gets the scan schedules of one site, returns a list of 'data' dicts (one per schedule).
+
+        '''
+        rows = []
+        all_scans = self.client.iter_resources(f"/sites/{s_ID}/scan_schedules") # Scan sched. API call.
+        for item in all_scans: # Interprets through output and fills 'data' dictionary.  
+            # A dictionary that stores data sorted by site ID
+            try:
+                data = {'Site ID':s_ID,
+                        'Enabled':item['enabled'],
+                        'Scan Schedule ID':item['id'],
+                        'Scan Name':item['scanName'],
+                        'Scan Template ID':item['scanTemplateId'],
+                        'Scan Engine ID':item['scanEngineId'],
+                        'Included Assets':None,
+                        'Excluded Assets':None,
+                        'Start Time':item['start']}               
+            except:
+                data = {'Site ID':s_ID,
+                        'Enabled':item['enabled'],
+                        'Scan Schedule ID':item['id'],
+                        'Scan Name':item['scanName'],
+                        'Scan Template ID':item['scanTemplateId'],
+                        'Included Assets':None,
+                        'Excluded Assets':None,
+                        'Start Time':item['start']} 
+            try:
+                if 'includedTargets' in item['assets'].keys():
+                    data['Included Assets'] = set(item['assets']['includedTargets']['addresses']) # Stores inc targets to 'data'.
+
+                if 'excludedTargets' in item['assets'].keys():
+                    data['Excluded Assets'] = set(item['assets']['excludedTargets']['addresses']) # Stores exc targets to 'data'.
+            except:
+                pass
+            rows.append(data)
+        return rows
         
     def get_scanSchedules(self):
         ''' 
         > Fucntion: Gets and stores API data for site scan schedules.
+                    Sites are fetched concurrently (up to 'self.concurrency' at once) and kept in site ID order.
 
         '''
         print('Getting site scan-schedules data..') # Status update
         
-        scans_df = pd.DataFrame()
-        for s_ID in self.site_IDs: # Iterates through all Nexpose sites and gets their scan-schedule targets.
-            all_scans_response = requests.get(self.host + f"/sites/{s_ID}/scan_schedules",
-                                              auth=self.get_auth(), params={'size': 500}, verify=False) # Scan sched. API call.
-            for item in all_scans_response.json()['resources']: # Interprets through output and fills 'data' dictionary.  
-                # A dictionary that stores data sorted by site ID
-                try:
-                    data = {'Duration of Scan':item['duration']}
-                except:
-                    pass
-                try:
-                    data = {'Site ID':s_ID,
-                            'Enabled':item['enabled'],
-                            'Scan Schedule ID':item['id'],
-                            'Scan Name':item['scanName'],
-                            'Scan Template ID':item['scanTemplateId'],
-                            'Scan Engine ID':item['scanEngineId'],
-                            'Included Assets':None,
-                            'Excluded Assets':None,
-                            'Start Time':item['start']}               
-                except:
-                    data = {'Site ID':s_ID,
-                            'Enabled':item['enabled'],
-                            'Scan Schedule ID':item['id'],
-                            'Scan Name':item['scanName'],
-                            'Scan Template ID':item['scanTemplateId'],
-                            'Included Assets':None,
-                            'Excluded Assets':None,
-                            'Start Time':item['start']} 
-                try:
-                    if 'includedTargets' in item['assets'].keys():
-                        data['Included Assets'] = set(item['assets']['includedTargets']['addresses']) # Stores inc targets to 'data'.
-
-                    if 'excludedTargets' in item['assets'].keys():
-                        data['Excluded Assets'] = set(item['assets']['excludedTargets']['addresses']) # Stores exc targets to 'data'.
-                except:
-                    pass
-                # Appending 'data' dict into a dataframe: 
-                scans_df = scans_df.append(data, ignore_index=True) 
-                scans_df = scans_df.replace(np.nan,'',regex=True) # Replaces all NaN/Null values with an empty string.
+        records = RecordBuilder()
+        for rows in self.client.fan_out(self.journaled('scanSchedules', self.fetch_scanSchedules),
+                                        self.sites_to_fetch(), workers=self.concurrency):
+            records.extend(rows) # Collecting 'data' dicts in column buffers
+        scans_df = records.build() # Builds the dataframe once, replacing all NaN/Null values with an empty string.
+        scans_df = self.carry_forward('scanSchedules', scans_df) # Adds unchanged sites' rows (incremental mode).
 
         self.scanSchedules = scans_df # Saving as a class attribute.
+
+    def fetch_siteCreds(self, s_ID):
+        ''' 
+        > Fucntion: Gets the shared credentials of one site, returns a list of 'data' dicts (one per credential).
+
+        '''
+        rows = []
+        siteCreds = self.client.iter_resources(f"/sites/{s_ID}/shared_credentials") # Site alerts API call
+        site = self.site_document(s_ID) # Gets site name (memoized, shared with 'fetch_siteInfo')
+        
+        # Creating a dictionary that stores data sorted by site ID
+        for item in siteCreds:
+            data = {'Site ID':s_ID,
+                    'Site Name': None,
+                    'Site Credential Enabled?':item['enabled'],
+                    'Credential Name':item['name'],
+                    'Credential ID':item['id'],
+                    'Credential Service':item['service']}
+            data['Site Name'] = site['name']
+            rows.append(data)
+        return rows
     
     def get_siteCreds(self):
         ''' 
         > Fucntion: Gets and stores API data for site shared credentials.
+                    Sites are fetched concurrently (up to 'self.concurrency' at once) and kept in site ID order.
 
         '''
         print('Getting site credentials data..') # Status update
         
-        dataframe = pd.DataFrame()
-        for s_ID in self.site_IDs:
-            siteCreds = requests.get(self.host + f"/sites/{s_ID}/shared_credentials",
-                                      auth=self.get_auth(), params={'size':500}, verify=False) # Site alerts API call
-            site_name = requests.get(self.host + f"/sites/{s_ID}",
-                           auth=self.get_auth(), params={'size': 500}, verify=False) # Gets site name
-            
-            # Creating a dictionary that stores data sorted by site ID
-            for item in siteCreds.json()['resources']:
-                data = {'Site ID':s_ID,
-                        'Site Name': None,
-                        'Site Credential Enabled?':item['enabled'],
-                        'Credential Name':item['name'],
-                        'Credential ID':item['id'],
-                        'Credential Service':item['service']}
-                data['Site Name'] = site_name.json()['name']
-                # Saving data in a dataframe format
-                dataframe = dataframe.append(data, ignore_index = True)
-                dataframe = dataframe.replace(np.nan,'',regex=True) # Replaces all NaN/Null values with an empty string.
+        records = RecordBuilder()
+        for rows in self.client.fan_out(self.journaled('siteCreds', self.fetch_siteCreds), self.sites_to_fetch(),
+                                        workers=self.concurrency):
+            records.extend(rows) # Collecting data in column buffers
         convert = {'Site ID': int}
-        dataframe = dataframe.astype(convert)
+        dataframe = records.build(convert) # Builds the dataframe once, replacing all NaN/Null values with an empty string.
+        dataframe = self.carry_forward('siteCreds', dataframe) # Adds unchanged sites' rows (incremental mode).
         dataframe.sort_values(by=['Site ID'])
         self.siteCreds = dataframe # Saving as a class attribute.
     
@@ -245,11 +376,8 @@ class Main: # Class stores all needed Nexpose data as class attributes to then b
         '''
         print("Getting scan templates data..") # Status update
         
-        dataframe = pd.DataFrame()
-        url = self.host + f"/scan_templates"                               
-        response = requests.get(url, auth=self.get_auth(), params={'page':0, 'size':500}, verify=False)
-        response.raise_for_status()
-        output = response.json()['resources']
+        records = RecordBuilder()
+        output = self.client.iter_resources("/scan_templates") # Walks every page of the endpoint.
         # Creating a dictionary that stores data
         for item in output:
             try:
@@ -280,9 +408,7 @@ class Main: # Class stores all needed Nexpose data as class attributes to then b
                       'Max Parallel Assets':item['maxParallelAssets'],
                       'Max Scan Processes':item['maxScanProcesses'],
                       'Telnet':item['telnet']}
-            # Saving data in a dataframe format
-            dataframe = dataframe.append(data, ignore_index = True)
-            dataframe = dataframe.replace(np.nan,'',regex=True) # Replaces all NaN/Null values with an empty string.
+            records.append(data) # Collecting data in column buffers
         convert = {'Scan Template ID': str,
                    'Discovery Only?': bool,
                    'Enhanced Logging?': bool,
@@ -290,7 +416,7 @@ class Main: # Class stores all needed Nexpose data as class attributes to then b
                    'Vulnerability Enabled?': bool,
                    'Web Enabled?': bool,
                    'Windows Services Enabled?': bool}
-        dataframe = dataframe.astype(convert)
+        dataframe = records.build(convert) # Builds the dataframe once, replacing all NaN/Null values with an empty string.
         dataframe.sort_values(by=['Scan Template ID'])
         self.scanTemplates = dataframe # Saving as a class attribute.
     
@@ -301,11 +427,8 @@ class Main: # Class stores all needed Nexpose data as class attributes to then b
         '''
         print("Getting scan engines data..") # Status update
         
-        dataframe = pd.DataFrame()
-        url = self.host + "/scan_engines"
-        response = requests.get(url, auth=self.get_auth(), params={'page':0, 'size':500}, verify=False)
-        response.raise_for_status()
-        output = response.json()['resources']
+        records = RecordBuilder()
+        output = self.client.iter_resources("/scan_engines") # Walks every page of the endpoint.
         # Creating a dictionary that stores data:
         for item in output:
             try:
@@ -324,12 +447,10 @@ class Main: # Class stores all needed Nexpose data as class attributes to then b
                       'Port':item['port'],
                       'Content Version':item['contentVersion'],
                       'Product Version':item['productVersion']}
-            # Appending 'data' dict into a dataframe:
-            dataframe = dataframe.append(data, ignore_index = True)
-            dataframe = dataframe.replace(np.nan,'',regex=True) # Replaces all NaN/Null values with an empty string.
+            records.append(data) # Collecting 'data' dict in column buffers
             
         convert = {'Scan Engine ID': int}
-        dataframe = dataframe.astype(convert)
+        dataframe = records.build(convert) # Builds the dataframe once, replacing all NaN/Null values with an empty string.
         dataframe.sort_values(by=['Scan Engine ID'])
         self.scanEngines = dataframe # Saving as a class attribute.
         for item in self.scanEngines['Scan Engine ID']: # Saving scan engine IDs as a class attribute
@@ -342,11 +463,8 @@ class Main: # Class stores all needed Nexpose data as class attributes to then b
         '''
         print("Getting scan engine pools data..") # Status update
         
-        dataframe = pd.DataFrame()
-        url = self.host + "/scan_engine_pools"
-        response = requests.get(url, auth=self.get_auth(), params={'page':0, 'size':500}, verify=False)
-        response.raise_for_status()
-        output = response.json()['resources']
+        records = RecordBuilder()
+        output = self.client.iter_resources("/scan_engine_pools") # Walks every page of the endpoint.
         # Creating a dictionary that stores data:
         for item in output:
             try:
@@ -354,13 +472,11 @@ class Main: # Class stores all needed Nexpose data as class attributes to then b
                       'Pool Name':item['name'],
                       'Pool Engines':item['engines']}
             except:
-                pass
-            # Appending 'data' dict into a dataframe:
-            dataframe = dataframe.append(data, ignore_index = True)
-            dataframe = dataframe.replace(np.nan,'',regex=True) # Replaces all NaN/Null values with an empty string.
+                continue
+            records.append(data) # Collecting 'data' dict in column buffers
             
         convert = {'Pool ID': int}
-        dataframe = dataframe.astype(convert)
+        dataframe = records.build(convert) # Builds the dataframe once, replacing all NaN/Null values with an empty string.
         dataframe.sort_values(by=['Pool Name'])
         self.enginePools = dataframe # Saving as a class attribute.
     
@@ -368,19 +484,14 @@ class Main: # Class stores all needed Nexpose data as class attributes to then b
         '''
             > Function: Gets names and IDs of all users on Nexpose
         '''
-        host = self.host
-        dataframe = pd.DataFrame() # Empty dataframe
+        records = RecordBuilder() # Empty column buffers
 
         print("Getting Nexpose users info..") # Status update
 
-        url = f"{host}/users" # Nexspose API databse URL (Assigns which part to access of the DB).
-        response = requests.get(url, auth=self.get_auth(), params={'page':0, 'size':500}, verify=False)
-        response.raise_for_status() # Reports back errors/issues.
-
         data = {'User Name':None,
                 'User ID':None}
 
-        for item in response.json()['resources']:
+        for item in self.client.iter_resources("/users"): # Walks every page of users.
             try:
                 data['User Name'] = item['name']
             except:
@@ -389,12 +500,11 @@ class Main: # Class stores all needed Nexpose data as class attributes to then b
                 data['User ID'] = item['id']
             except:
                 pass
-            dataframe = dataframe.append(data, ignore_index=True) # Appending data's info to a dataframe
-            dataframe = dataframe.replace(np.nan,'',regex=True)
+            records.append(data) # Collecting data's info in column buffers
 
         # Sorts the dataframe by a certain column:
         convert = {'User ID': int}
-        dataframe = dataframe.astype(convert) # Ensure IDs are 'int' datatype
+        dataframe = records.build(convert) # Builds the dataframe once, ensuring IDs are 'int' datatype
         dataframe.sort_values(by=['User ID'])
         self.users = dataframe # Saving as a class attribute.
     
@@ -402,14 +512,11 @@ class Main: # Class stores all needed Nexpose data as class attributes to then b
         '''
             > Function: Gets console version info
         '''
-        host = self.host
-        dataframe = pd.DataFrame() # Empty dataframe
+        records = RecordBuilder() # Empty column buffers
 
         print("Getting Nexpose console info..") # Status update
 
-        url = f"{host}/administration/info" # Nexspose API databse URL (Assigns which part to access of the DB).
-        response = requests.get(url, auth=self.get_auth(), params={'page':0, 'size':500}, verify=False)
-        response.raise_for_status() # Reports back errors/issues.
+        info = self.client.get_json("/administration/info") # Console info API call (memoized & cached)
 
         data = {'Content Version':None,
                 'Content Version (Partial)':None,
@@ -417,7 +524,7 @@ class Main: # Class stores all needed Nexpose data as class attributes to then b
                 'Version ID':None,
                 'Product':None}
 
-        response_dict = response.json()['version']['update']
+        response_dict = info['version']['update']
 
         try:
             data['Content Version'] = response_dict['content']
@@ -439,57 +546,89 @@ class Main: # Class stores all needed Nexpose data as class attributes to then b
             data['Product'] = response_dict['product']
         except:
             pass
-        dataframe = dataframe.append(data, ignore_index=True) # Appending data's info to a dataframe
-        dataframe = dataframe.replace(np.nan,'',regex=True)
+        records.append(data) # Collecting data's info in column buffers
 
-        self.console = dataframe # Saving as a class attribute.
+        self.console = records.build() # Saving as a class attribute.
     
     def save_data(self):
         ''' 
-        > Functionality: Saves all API data retrieved as .pkl files at the 'Data' directory.
+        > Functionality: Saves all API data retrieved as Parquet and/or .csv files at the 'Data/<date>' directory,
+                         along with the site summaries & fetch dates used by incremental runs.
 
         '''
-        print("Saving Nexpose API data as CSV files..")
+        print(f"Saving Nexpose API data as {'/'.join(self.snapshot_formats)} files..")
         date_today = date(day=int(strftime('%d')), month=int(strftime('%m')), year=int(strftime('%Y'))).strftime('%Y-%m-%d') # Gets current date and time
-        # Creating the correctly formatted directory for nexpose data:
-        directory = f'{date_today}'
-        parent_dir = f'C:\\YourDirectory\\Nexpose\\Data\\'
-        path = os.path.join(parent_dir, directory)
-        try:
-            os.mkdir(path)
-        except FileExistsError:
-            pass
-        
-        # Saving data as CSV:
-        self.siteCreds.to_csv(f"Data/{date_today}/Site_Credentials_Configs.csv", index = False, header = True)
-        self.siteInfo.to_csv(f"Data/{date_today}/Site_Defaults.csv", index = False, header = True)
-        self.scanSchedules.to_csv(f"Data/{date_today}/Scan_Schedules_Configs.csv", index = False, header = True)
-        self.scanEngines.to_csv(f"Data/{date_today}/Scan_Engines_Configs.csv", index = False, header = True)
-        self.enginePools.to_csv(f"Data/{date_today}/Engine_Pools_Configs.csv", index = False, header = True)
-        self.scanTemplates.to_csv(f"Data/{date_today}/Scan_Templates_Configs.csv", index = False, header = True)
-        self.users.to_csv(f"Data/{date_today}/Users.csv", index = False, header = True)
-        self.console.to_csv(f"Data/{date_today}/Console_Info.csv", index = False, header = True)
-        print('CSV files saved under "Data" directory')
+        # Creating the correctly formatted directory for nexpose data and saving data
+        # (datasets whose collector failed are skipped):
+        path = os.path.join(DATA_DIR, date_today)
+        datasets = {'siteCreds': self.siteCreds,
+                    'siteInfo': self.siteInfo,
+                    'scanSchedules': self.scanSchedules,
+                    'scanEngines': self.scanEngines,
+                    'enginePools': self.enginePools,
+                    'scanTemplates': self.scanTemplates,
+                    'users': self.users,
+                    'console': self.console}
+        site_data_saved = all(datasets[name] is not None for name in ('siteInfo', 'scanSchedules', 'siteCreds'))
+        # Summaries are only saved alongside complete site data, so the next incremental run can trust them:
+        fetched = {s_ID: self.site_fetched.get(s_ID, date_today) for s_ID in self.site_IDs} if site_data_saved else None
+        write_snapshot(path, datasets, summaries=self.site_summaries if site_data_saved else None,
+                       formats=self.snapshot_formats, fetched=fetched)
+        print(f'Files saved under "{path}" directory')
         
     def loader(self):
         '''
-        > Fucntion: Loads above methods to populate class attributes
+        > Fucntion: Loads above methods to populate class attributes.
+                    Collectors run as a task graph: site-scoped ones start once 'get_siteIDs' is done, all others
+                    start right away. A failing collector only skips the ones depending on it, and data is saved
+                    once every task has finished. Per-site fetches are journaled so an interrupted run can be resumed.
         '''
         start = timer()
-        self.get_siteIDs()
-        self.get_siteAssets()
-        self.get_siteInfo()
-        self.get_scanSchedules()
-        self.get_siteCreds()
-        self.get_scanTemplates()
-        self.get_scanEngines()
-        self.get_enginePools()
-        self.get_users()
-        self.get_consoleInfo()
+        run_date = date.today().strftime('%Y-%m-%d') # Journals are per host and per snapshot date.
+        self.journal = Journal(journal_path('api_calls', self.host, run_date), resume=self.resume)
+        if self.journal.resumed:
+            print(f"Resuming from '{self.journal.path}': {self.journal.resumed} per-site fetch(es) already done..")
+        graph = TaskGraph()
+        graph.add('get_siteIDs', self.get_siteIDs)
+        site_inputs = ['get_siteIDs']
+        if self.incremental: # Site-scoped collectors also wait for the list of new/modified sites.
+            graph.add('plan_sync', self.plan_sync, depends_on=['get_siteIDs'])
+            site_inputs = ['plan_sync']
+        graph.add('get_siteInfo', self.get_siteInfo, depends_on=site_inputs)
+        graph.add('get_scanSchedules', self.get_scanSchedules, depends_on=site_inputs)
+        graph.add('get_siteCreds', self.get_siteCreds, depends_on=site_inputs)
+        graph.add('get_scanTemplates', self.get_scanTemplates)
+        graph.add('get_scanEngines', self.get_scanEngines)
+        graph.add('get_enginePools', self.get_enginePools)
+        graph.add('get_users', self.get_users)
+        graph.add('get_consoleInfo', self.get_consoleInfo)
+        graph.run()
+        graph.report() # Prints per-task status and timings
         self.save_data()
+        if all(status == 'done' for status in graph.status.values()):
+            self.journal.complete() # Nothing left to resume.
+        else:
+            self.journal.close() # Failed collectors' sites are kept for '--resume'.
         end = timer()
         print("\nAll done! code execution time: ",round((end-start)/60)," minute(s)")
 
 
-main = Main() # Instantiates an object of the 'Main()' class
+parser = argparse.ArgumentParser(description="Pulls Nexpose API data and saves it under the 'Data' directory.")
+parser.add_argument('--cache', action='store_true', help=f'keep API responses in an on-disk cache ({CACHE_PATH})')
+parser.add_argument('--offline', action='store_true', help='serve every API call from the on-disk cache only')
+parser.add_argument('--incremental', action='store_true',
+                    help="only refetch schedules/credentials of sites that are new or whose '/sites' entry changed since "
+                         "the last snapshot (edits to schedules or shared credentials alone are NOT detected, those sites "
+                         "are refetched once their data is --max-carry-days old)")
+parser.add_argument('--max-carry-days', type=int, default=MAX_CARRY_DAYS,
+                    help=f'max age in days of site data carried forward by --incremental (default: {MAX_CARRY_DAYS})')
+parser.add_argument('--resume', action='store_true',
+                    help='reuse the per-site fetches of an interrupted run (from its journal) instead of refetching them')
+parser.add_argument('--format', choices=['parquet', 'csv', 'both'], default='parquet',
+                    help='snapshot file format (default: parquet)')
+args = parser.parse_args()
+
+main = Main(cache_path=CACHE_PATH if args.cache else None, offline=args.offline, incremental=args.incremental,
+            snapshot_formats=FORMATS if args.format == 'both' else (args.format,), resume=args.resume,
+            max_carry_days=args.max_carry_days) # Instantiates an object of the 'Main()' class
 main.loader() # Runs all above methods/API calls
@@ -18,6 +18,7 @@ import sys
 import datetime
 from datetime import datetime, timedelta, date
 from time import strftime
+from asset_index import load_assets
 
 def drop_domain(in_name):
     '''
@@ -29,15 +30,33 @@ def drop_domain(in_name):
         out_name = in_name
     return out_name
 
-# USE THIS FILE TO LOOKUP ASSETS IN NEXPOSE
-assets = pd.read_csv('C:/Data/All_Assets.csv') # Change to match your all assets file
+def read_entries(path, normalize=None):
+    '''
+        > Function: reads the input file once, returns its entries (one per line, blank lines skipped, duplicates removed).
+        > Input: file path and an optional function normalizing each entry.
+    '''
+    with open(path) as file:
+        lines = [line.strip() for line in file.read().split('\n') if line.strip()]
+    if normalize is not None:
+        lines = [normalize(line) for line in lines]
+    return list(dict.fromkeys(lines)) # Removes duplicates, keeps the file's order
+
+def save_results(data, misses):
+    '''
+        > Function: writes all results to one .csv file and the entries that matched nothing to a miss report (.txt).
+    '''
+    now = datetime.now() # Getting today's date & time
+    date_str = now.strftime("%m-%d-%Y_T%H-%M-%S") # Creating date-time string
+    data.to_csv(f'Output/Asset IDs/{date_str}.csv', index=False) # Saving results
+    with open(f'Output/Asset IDs/{date_str}_misses.txt', 'w') as f: # Saving entries that matched nothing
+        f.write(''.join(f'{entry}\n' for entry in misses))
+    print(f"All done! {len(data)} matching row(s) were saved to '/Output/Asset IDs/{date_str}.csv'")
+    print(f"{len(misses)} entr(y/ies) matched no asset, see '/Output/Asset IDs/{date_str}_misses.txt'")
 
-# Filtering 'assets' dataframe:
-assets['host_name'] = assets['host_name'].apply(drop_domain) # dropping domains on 'host_name' column
-assets = assets.sort_values('host_name', ascending=True) # sorting 'host_name' column
-assets['host_name'] = assets['host_name'].str.lower() # lower-casing all data in 'host_name' column
-assets['ip_address_all'] = assets['ip_address_all'].apply(lambda x: x.split(', ')) # splits multiple IPs in 'ip_address_all'
-assets = assets.explode('ip_address_all') # assigns each IP to its own row
+# USE THIS FILE TO LOOKUP ASSETS IN NEXPOSE
+ASSETS_CSV = 'C:/Data/All_Assets.csv' # Change to match your all assets file
+index = load_assets(ASSETS_CSV) # Loads the prebuilt asset index (rebuilt only when the .csv file changes)
+assets = index.table # Normalized 'assets' dataframe (domains dropped, lower-cased host names, one row per asset)
 print('assets size: ',assets.shape[0])
 
 x = 1
@@ -52,29 +71,10 @@ while x == 1:
         if (os.path.isfile(ip_file)) == True:
             
             if ip_file.endswith('.txt'):
-                output = pd.DataFrame() # Empty dataframe which will contain all results
                 print('\nFile found! Getting results..')
-                file = open(ip_file)
-                file_content = file.read() # Reads the contents of the input file
-                lines = file_content.split('\n') # Splits entries using the newline character as a delimiter
-                for line in lines:
-                    IP = line
-                    DB = assets.copy()
-                    DB = DB[['asset_id','host_name','ip_address_all','vulnerabilities','Operating System',
-                             'Last Scan Date','Site ID', 'Authentication']]
-
-                    data = pd.DataFrame() # Contains search results
-
-                    for entry in DB['ip_address_all']:
-                        if IP == entry:
-                            data = data.append(DB[DB.ip_address_all.str.contains(IP)])
-                    
-                    now = datetime.now() # Getting today's date & time
-                    date_str = now.strftime("%m-%d-%Y_T%H-%M-%S") # Creating date-time string
-                    output = output.append(data)
-                    
-                output.to_csv(f'Output/Asset IDs/{date_str}.csv', index=False) # Saving results
-                print("All done! Results were saved to '/Output/Asset IDs'")
+                IPs = read_entries(ip_file) # Loads the whole IP list once
+                data, misses = index.find_ips(IPs) # Exact IP matches for every IP at once
+                save_results(data, misses)
                     
             else:
                 print("\nInvalid input! File is not a .txt!")
@@ -88,29 +88,11 @@ while x == 1:
                          "all asset hostnames (have each hostname seaparated by a newline): \n")
 
         if (os.path.isfile(hn_file)) == True: # checks if file exists
-            if ip_file.endswith('.txt'): # check if file type is .txt
+            if hn_file.endswith('.txt'): # check if file type is .txt
                 print('\nFile found! Getting results..')
-                output = pd.DataFrame() # empty dataframe which will contain all results
-                file = open(hn_file) # opens the hostnames file
-                file_content = file.read() # Reads the contents of the input file
-                lines = file_content.split('\n') # Splits entries using the newline character as a delimiter
-                for line in lines: # goes through each hostname in the hn_file
-                    hostname = line
-                    hostname = hostname.lower() # lower-cases each hostname in the file
-                    hostname = drop_domain(hostname) # applies drop_domain function on the hostname
-                    DB = assets.copy() # creates a copy of the all_assets.csv file above (assets)
-                    DB = DB[['asset_id','host_name','ip_address_all','vulnerabilities','Operating System',
-                             'Last Scan Date','Site ID', 'Authentication']] # choosing specific column to filter for from the all_assets file
-
-                    data = pd.DataFrame() # Contains search results (output)
-                    data = data.append(DB[DB.host_name.str.contains(hostname, na=False)]) # queries the user provided hostname through the all_assets file's 'host_name' column
-                    
-                    now = datetime.now() # gets today's date & time
-                    date_str = now.strftime("%m-%d-%Y_T%H-%M-%S") # creating date-time string
-                    output = output.append(data) # appends info from 'data' into 'output' at each for-loop iteration
-                    
-                output.to_csv(f'Output/Asset IDs/{date_str}.csv', index=False) # Saving results to 'Output' directory
-                print("All done! Results were saved to '/Output/Asset IDs'")
+                hostnames = read_entries(hn_file, lambda line: drop_domain(line.lower())) # lower-cases & drops domains once
+                data, misses = index.find_hostnames(hostnames) # Exact hostname matches for every hostname at once
+                save_results(data, misses)
                 
             else:
                 print("\nInvalid input! File is not a .txt!")
@@ -121,5 +103,3 @@ while x == 1:
     elif search =='0': # user chose to exit the program
         print("Exiting program..")
         sys.exit()
-        
-
@@ -0,0 +1,469 @@
+'''
+Copyright (c) 2022, Volkovx
+All rights reserved.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+This module builds a prebuilt index of a Nexpose all-assets export (e.g. 'All_Assets.csv'), shared by 'asset_lookup.py'
+and 'asset_id_finder.py'. The export is normalized once with vectorized string operations (domains dropped and host
+names lower-cased) and saved next to the CSV as a Feather file ('All_Assets.index.feather'). Later launches load that
+file instead of re-parsing the CSV; it is rebuilt only when the CSV's modification time or content hash changes. A CSV
+that was only touched (same content) keeps its index and gets its new modification time recorded in a small sidecar
+file ('All_Assets.index.json'), so later launches don't hash it again.
+
+The table is kept compact: only the columns the lookup scripts show are read, with explicit dtypes (categoricals for
+low-cardinality fields like 'Operating System', 'Site ID' and 'Authentication', parsed scan dates), one row per asset
+sorted by host name. IP addresses are packed into 16-byte keys (the same keys as 'target_index.py') held in one values
+array plus per-asset offsets, instead of one duplicated row per IP; results are expanded to one row per IP only when
+they are returned.
+
+Host names are searched literally (no regex): exact and prefix queries are binary searches over the sorted names,
+substring queries go through a trigram inverted index (every 3-character slice of every host name points to the names
+holding it), so only the few names sharing all of the query's trigrams are actually compared.
+
+Fuzzy search ('web01' vs 'web-01') uses the same trigram index as a filter: a name within edit distance d of the query
+shares all but at most 3 * d of the query's trigrams (names padded at both ends), so only names passing that count &
+length check get an actual edit distance computed.
+
+__author__ = xVolkov
+__github__ = https://github.com/xVolkov
+__date__ = 10/18/2026
+__version__ = 1.0
+'''
+
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from target_index import ips_to_keys, key_to_int, int_to_ip
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError: # Without pyarrow the index is rebuilt in memory on every launch.
+    pa = None
+
+INDEX_SUFFIX = '.index.feather' # Index file name = CSV file name (without '.csv') + this suffix.
+INDEX_VERSION = 3
+METADATA_KEY = b'asset_index' # Feather schema metadata key holding the source CSV's fingerprint.
+FINGERPRINT_SUFFIX = '.index.json' # Sidecar holding the CSV's refreshed fingerprint once it was touched but unchanged.
+CHUNK_SIZE = 65536 # Host names turned into trigrams at a time (bounds the memory used while indexing).
+FUZZY_DISTANCE = 2 # Default maximum edit distance of fuzzy host name searches.
+FUZZY_LIMIT = 10 # Default number of closest host names returned by a fuzzy search.
+PADDING = ('\x01\x01', '\x02\x02') # Marks the start & end of host names so their edges get trigrams too.
+COLUMNS = ['asset_id', 'host_name', 'ip_address_all', 'vulnerabilities', 'Operating System', 'Last Scan Date',
+           'Site ID', 'Authentication'] # Columns read from the export (in this order), others are skipped.
+# Explicit dtypes of the columns read (others are read as text):
+DTYPES = {'asset_id': 'int64', 'host_name': 'str', 'ip_address_all': 'str', 'vulnerabilities': 'Int32',
+          'Operating System': 'category', 'Site ID': 'category', 'Authentication': 'category'}
+DATE_COLUMNS = ['Last Scan Date'] # Columns parsed as dates.
+
+
+def index_path(csv_path):
+    '''
+        > Function: returns the index file path of an assets export.
+    '''
+    return os.path.splitext(csv_path)[0] + INDEX_SUFFIX
+
+
+def fingerprint_path(csv_path):
+    '''
+        > Function: returns the fingerprint sidecar path of an assets export.
+    '''
+    return os.path.splitext(csv_path)[0] + FINGERPRINT_SUFFIX
+
+
+def file_hash(path):
+    '''
+        > Function: returns the SHA-1 hash of a file's content (read in 1 MB chunks).
+    '''
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint(csv_path, with_hash=True):
+    '''
+        > Function: describes the state of the source CSV (modification time, size and optionally content hash).
+    '''
+    stat = os.stat(csv_path)
+    return {'version': INDEX_VERSION, 'mtime': stat.st_mtime, 'size': stat.st_size,
+            'sha1': file_hash(csv_path) if with_hash else None}
+
+
+def read_export(csv_path):
+    '''
+        > Function: reads an assets export, only the columns in 'COLUMNS', with explicit dtypes & parsed dates.
+    '''
+    header = pd.read_csv(csv_path, nrows=0).columns
+    columns = [c for c in COLUMNS if c in header]
+    return pd.read_csv(csv_path, usecols=columns, dtype={c: t for c, t in DTYPES.items() if c in columns},
+                       parse_dates=[c for c in DATE_COLUMNS if c in columns])
+
+
+def normalize(assets):
+    '''
+        > Function: normalizes an assets export with vectorized string operations: drops domains from & lower-cases
+                    'host_name', sorts assets by host name and packs each asset's 'ip_address_all' into index keys.
+        > Output: (assets table without 'ip_address_all', per-asset IP offsets, 'S16' IP key array); asset i's
+                  IP keys are keys[offsets[i]:offsets[i + 1]]. Values that aren't IP addresses are dropped.
+    '''
+    assets['host_name'] = assets['host_name'].str.split('.', n=1).str[0].str.lower() # Same as 'drop_domain' + lower()
+    assets = assets.sort_values('host_name', kind='stable', na_position='first').reset_index(drop=True) # Missing = ''
+    ips = assets.pop('ip_address_all').fillna('').str.split(', ').explode() # One entry per IP, indexed by asset row
+    keys, valid = ips_to_keys(ips.astype(str).str.strip().tolist())
+    owners = ips.index.to_numpy()[valid] # Asset row of every kept IP (in row order)
+    offsets = np.searchsorted(owners, np.arange(len(assets) + 1)).astype(np.int64)
+    return assets, offsets, keys[valid]
+
+
+def ranges(starts, ends):
+    '''
+        > Function: concatenates the integer ranges [starts[i], ends[i]) into one array (vectorized).
+    '''
+    lengths = np.asarray(ends, dtype=np.int64) - np.asarray(starts, dtype=np.int64)
+    if not lengths.sum():
+        return np.zeros(0, dtype=np.int64)
+    return np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+
+
+def format_keys(keys):
+    '''
+        > Function: converts IP index keys back to IP address strings.
+    '''
+    return [int_to_ip(key_to_int(key)) for key in keys]
+
+
+def trigrams(codes):
+    '''
+        > Function: packs every 3-character slice of fixed-width strings into one integer (21 bits per character).
+        > Input: a 2D array of Unicode code points (one row per string, zero-padded).
+        > Output: (trigram array, mask of the slices lying inside their string) of the same 2D shape.
+    '''
+    codes = codes.astype(np.int64)
+    grams = (codes[:, :-2] << 42) | (codes[:, 1:-1] << 21) | codes[:, 2:]
+    return grams, codes[:, 2:] != 0
+
+
+def edit_distances(text, names, max_distance):
+    '''
+        > Function: computes the Levenshtein distance between a string and every name of an array at once (the dynamic
+                    programming table is filled one cell at a time for all names together, as NumPy vectors).
+        > Input: the string, a NumPy str array of names and the largest distance of interest.
+        > Output: an array of distances, capped at max_distance + 1.
+    '''
+    limit = max_distance + 1
+    distances = []
+    for first in range(0, len(names), CHUNK_SIZE): # A chunk of names at a time bounds the memory used
+        chunk = names[first:first + CHUNK_SIZE]
+        width = max(chunk.dtype.itemsize // 4, 1)
+        codes = chunk.astype(f'U{width}').view(np.uint32).reshape(len(chunk), width)
+        previous = np.tile(np.minimum(np.arange(width + 1, dtype=np.int32), limit), (len(chunk), 1))
+        for i, char in enumerate(text, 1):
+            current = np.empty_like(previous)
+            current[:, 0] = min(i, limit)
+            best = np.minimum(previous[:, :-1] + (codes != ord(char)), previous[:, 1:] + 1) # Substitution or deletion
+            for j in range(1, width + 1):
+                current[:, j] = np.minimum(best[:, j - 1], current[:, j - 1] + 1) # or insertion
+            np.minimum(current, limit, out=current)
+            previous = current
+        distances.append(previous[np.arange(len(chunk)), np.strings.str_len(chunk)])
+    return np.concatenate(distances) if distances else np.zeros(0, dtype=np.int32)
+
+
+class HostnameIndex:
+    def __init__(self, names):
+        '''
+        > Function: class constructor, builds the trigram inverted index of a list of host names.
+        > Input: sorted, unique host names (NumPy array of str).
+
+        '''
+        self.names = names.astype(str) # Sorted unique host names, searched for exact & prefix queries.
+        gram_parts, id_parts = [], []
+        for first in range(0, len(self.names), CHUNK_SIZE): # Trigrams of a chunk of names at a time
+            chunk = self.names[first:first + CHUNK_SIZE]
+            width = max(chunk.dtype.itemsize // 4, 3)
+            codes = chunk.astype(f'U{width}').view(np.uint32).reshape(len(chunk), width)
+            grams, inside = trigrams(codes)
+            gram_parts.append(grams[inside])
+            id_parts.append(np.broadcast_to(np.arange(first, first + len(chunk))[:, None], grams.shape)[inside])
+        grams = np.concatenate(gram_parts) if gram_parts else np.zeros(0, dtype=np.int64)
+        ids = np.concatenate(id_parts) if id_parts else np.zeros(0, dtype=np.int64)
+        order = np.lexsort((ids, grams)) # Sorted by trigram, then name
+        grams, ids = grams[order], ids[order]
+        unique = np.ones(len(grams), dtype=bool) # Keeps one (trigram, name) pair per repeated trigram
+        unique[1:] = (grams[1:] != grams[:-1]) | (ids[1:] != ids[:-1])
+        grams, ids = grams[unique], ids[unique]
+        self.grams, starts = np.unique(grams, return_index=True) # Sorted distinct trigrams
+        self.offsets = np.append(starts, len(grams)) # Trigram i's names are postings[offsets[i]:offsets[i + 1]]
+        self.postings = ids
+
+    def exact(self, name):
+        '''
+        > Function: returns the positions (in 'names') of the names equal to a host name.
+
+        '''
+        start, end = np.searchsorted(self.names, name, side='left'), np.searchsorted(self.names, name, side='right')
+        return np.arange(start, end)
+
+    def prefix(self, name):
+        '''
+        > Function: returns the positions of the names starting with a string.
+
+        '''
+        start, end = np.searchsorted(self.names, name, side='left'), np.searchsorted(self.names, name + '\uffff', side='right')
+        return np.arange(start, end)
+
+    def substring(self, text):
+        '''
+        > Function: returns the positions of the names containing a string (literal match).
+
+        '''
+        if len(text) < 3: # Too short for a trigram, compares every name
+            return np.flatnonzero(np.strings.find(self.names, text) >= 0)
+        grams, _ = trigrams(np.array([text]).view(np.uint32).reshape(1, len(text)))
+        candidates = None
+        for gram in np.unique(grams[0]): # Intersects the names of every trigram of the query
+            i = np.searchsorted(self.grams, gram)
+            if i == len(self.grams) or self.grams[i] != gram:
+                return np.zeros(0, dtype=np.int64)
+            names = self.postings[self.offsets[i]:self.offsets[i + 1]]
+            candidates = names if candidates is None else np.intersect1d(candidates, names, assume_unique=True)
+            if not len(candidates):
+                return candidates
+        return candidates[np.strings.find(self.names[candidates], text) >= 0] # Drops names with the trigrams out of order
+
+    def shared_trigrams(self, text):
+        '''
+        > Function: counts, for every name sharing at least one trigram with a string, how many distinct trigrams it shares.
+        > Output: (name positions, shared trigram counts, number of distinct trigrams of the string)
+
+        '''
+        grams, _ = trigrams(np.array([text]).view(np.uint32).reshape(1, len(text)))
+        grams = np.unique(grams[0])
+        found = np.searchsorted(self.grams, grams)
+        found = found[(found < len(self.grams)) & (self.grams[np.minimum(found, len(self.grams) - 1)] == grams)]
+        postings = [self.postings[self.offsets[i]:self.offsets[i + 1]] for i in found]
+        positions, counts = np.unique(np.concatenate(postings) if postings else np.zeros(0, dtype=np.int64), return_counts=True)
+        return positions, counts, len(grams)
+
+
+class AssetIndex:
+    def __init__(self, table, ip_offsets, ip_keys, id_order=None):
+        '''
+        > Function: class constructor, indexes a normalized assets table.
+        > Input: the table (one row per asset, sorted by host name), its IP offsets & keys (see 'normalize') and
+                 optionally the prebuilt asset ID row order (computed if missing).
+
+        '''
+        self.table = table # Stores the normalized assets table.
+        self.columns = [c for c in COLUMNS if c in table.columns or c == 'ip_address_all'] # Columns of the results.
+        self.ip_offsets = ip_offsets # Asset i's IPs are ip_keys[ip_offsets[i]:ip_offsets[i + 1]].
+        self.ip_keys = ip_keys
+        self.ip_owners = np.repeat(np.arange(len(table)), np.diff(ip_offsets)) # Asset row of every IP.
+        halves = np.ascontiguousarray(ip_keys).view('>u8').reshape(-1, 2) # Sorting two 64-bit halves beats sorting bytes.
+        self.ip_order = np.lexsort((halves[:, 1], halves[:, 0])) # IP positions sorted by address.
+        self.sorted_ips = ip_keys[self.ip_order]
+        ids = table['asset_id'].to_numpy()
+        self.id_order = np.argsort(ids, kind='stable') if id_order is None else id_order # Asset rows sorted by ID.
+        self.sorted_ids = ids[self.id_order]
+        host_names = table['host_name'].fillna('').astype(str).to_numpy() # Sorted already (missing names first, as '')
+        self.name_starts = np.flatnonzero(np.append(True, host_names[1:] != host_names[:-1])) # First row of each host name
+        self.name_starts = np.append(self.name_starts, len(host_names))
+        self.hostnames = None # Stores the HostnameIndex, built on the first host name search.
+        self.padded_hostnames = None # Stores the HostnameIndex of padded host names, built on the first fuzzy search.
+        self.unique_names = host_names[self.name_starts[:-1]].astype(str) # Sorted unique host names (NumPy str array)
+
+    def row_counts(self, positions):
+        '''
+        > Function: returns how many result rows each asset expands to (one per IP, one if it has none).
+
+        '''
+        return np.maximum(self.ip_offsets[positions + 1] - self.ip_offsets[positions], 1)
+
+    def rows(self, positions):
+        '''
+        > Function: returns the result rows of a list of asset rows, one row per IP address like the original export.
+
+        '''
+        positions = np.asarray(positions, dtype=np.int64)
+        counts = self.ip_offsets[positions + 1] - self.ip_offsets[positions]
+        found = self.table.iloc[np.repeat(positions, np.maximum(counts, 1))].reset_index(drop=True)
+        ips = np.full(len(found), None, dtype=object)
+        ips[np.repeat(counts > 0, np.maximum(counts, 1))] = format_keys(
+            self.ip_keys[ranges(self.ip_offsets[positions], self.ip_offsets[positions + 1])])
+        return found.assign(ip_address_all=ips)[self.columns]
+
+    def ip_rows(self, ip_positions):
+        '''
+        > Function: returns the result rows of a list of IP positions (each IP with its asset).
+
+        '''
+        found = self.table.iloc[self.ip_owners[ip_positions]].reset_index(drop=True)
+        return found.assign(ip_address_all=format_keys(self.ip_keys[ip_positions]))[self.columns]
+
+    def find_ip(self, ip):
+        '''
+        > Function: returns the rows of the assets holding an IP address (exact match, IPv4 or IPv6).
+
+        '''
+        return self.find_ips([ip])[0]
+
+    def find_ips(self, ips):
+        '''
+        > Function: finds the assets of a whole list of IP addresses at once (one vectorized binary search).
+        > Output: (matching rows, list of IP addresses that matched no asset)
+
+        '''
+        ips = [ip.strip() for ip in ips]
+        keys, valid = ips_to_keys(ips)
+        starts = np.searchsorted(self.sorted_ips, keys, side='left')
+        ends = np.where(valid, np.searchsorted(self.sorted_ips, keys, side='right'), starts)
+        found = self.ip_rows(self.ip_order[ranges(starts, ends)])
+        return found, [ip for ip, start, end in zip(ips, starts, ends) if start == end]
+
+    def find_id(self, asset_id):
+        '''
+        > Function: returns the rows of an asset ID.
+
+        '''
+        start, end = np.searchsorted(self.sorted_ids, asset_id, side='left'), np.searchsorted(self.sorted_ids, asset_id, side='right')
+        return self.rows(np.sort(self.id_order[start:end]))
+
+    def name_rows(self, positions):
+        '''
+        > Function: returns the asset rows of a list of unique host name positions.
+
+        '''
+        positions = np.asarray(positions, dtype=np.int64)
+        return ranges(self.name_starts[positions], self.name_starts[positions + 1])
+
+    def find_hostname(self, hostname, mode='exact'):
+        '''
+        > Function: returns the rows whose normalized host name equals, starts with or contains a host name
+                    (literal match, no regex).
+        > Input: the host name and the match mode ('exact', 'prefix' or 'substring').
+
+        '''
+        if self.hostnames is None:
+            self.hostnames = HostnameIndex(self.unique_names)
+        positions = {'exact': self.hostnames.exact, 'prefix': self.hostnames.prefix,
+                     'substring': self.hostnames.substring}[mode](hostname)
+        positions = positions[self.unique_names[positions] != ''] # Assets without a host name never match
+        return self.rows(self.name_rows(np.sort(positions)))
+
+    def find_hostnames(self, hostnames):
+        '''
+        > Function: finds the assets of a whole list of normalized host names at once (exact matches).
+        > Output: (matching rows, list of host names that matched no asset)
+
+        '''
+        hostnames = np.array(hostnames, dtype=str)
+        positions = np.minimum(np.searchsorted(self.unique_names, hostnames), max(len(self.unique_names) - 1, 0))
+        matched = (self.unique_names[positions] == hostnames) & (hostnames != '') if len(self.unique_names) else hostnames != hostnames
+        return self.rows(self.name_rows(positions[matched])), hostnames[~matched].tolist()
+
+    def find_similar(self, hostname, max_distance=FUZZY_DISTANCE, limit=FUZZY_LIMIT):
+        '''
+        > Function: fuzzy host name search, finds the 'limit' host names closest to a host name (within 'max_distance'
+                    edits), using shared trigrams to pick the few names worth comparing.
+        > Output: the rows of those host names, closest first, with an added 'Edit Distance' column.
+
+        '''
+        if self.padded_hostnames is None:
+            self.padded_hostnames = HostnameIndex(np.strings.add(np.strings.add(PADDING[0], self.unique_names), PADDING[1]))
+            self.name_lengths = np.strings.str_len(self.unique_names)
+        positions, counts, query_grams = self.padded_hostnames.shared_trigrams(PADDING[0] + hostname + PADDING[1])
+        threshold = query_grams - 3 * max_distance # Each edit removes at most 3 of the query's trigrams
+        candidates = positions[counts >= threshold] if threshold > 0 else np.arange(len(self.unique_names))
+        candidates = candidates[(np.abs(self.name_lengths[candidates] - len(hostname)) <= max_distance)
+                                & (self.unique_names[candidates] != '')]
+        distances = edit_distances(hostname, self.unique_names[candidates], max_distance)
+        order = np.lexsort((candidates, distances))[:limit] # Closest first, then by host name
+        order = order[distances[order] <= max_distance]
+        names = candidates[order]
+        positions = self.name_rows(names)
+        distances = np.repeat(np.repeat(distances[order], self.name_starts[names + 1] - self.name_starts[names]),
+                              self.row_counts(positions)) # One distance per result row
+        return self.rows(positions).assign(**{'Edit Distance': distances})
+
+    def find_similar_many(self, hostnames, max_distance=FUZZY_DISTANCE, limit=FUZZY_LIMIT):
+        '''
+        > Function: runs a fuzzy search for every host name of a list (e.g. read from an input file).
+        > Output: (all matching rows with a 'Query' column, list of host names that matched nothing)
+
+        '''
+        results, misses = [], []
+        for hostname in hostnames:
+            found = self.find_similar(hostname, max_distance, limit)
+            if len(found):
+                results.append(found.assign(Query=hostname))
+            else:
+                misses.append(hostname)
+        columns = ['Query'] + self.columns + ['Edit Distance']
+        return (pd.concat(results, ignore_index=True)[columns] if results else pd.DataFrame(columns=columns)), misses
+
+
+def build_index(csv_path):
+    '''
+        > Function: reads & normalizes an assets export, then saves its index next to it (when pyarrow is installed).
+        > Output: the AssetIndex.
+    '''
+    print(f"Building the asset index of '{csv_path}'..")
+    if os.path.isfile(fingerprint_path(csv_path)): # Describes the previous index, the new one carries its own.
+        os.remove(fingerprint_path(csv_path))
+    index = AssetIndex(*normalize(read_export(csv_path)))
+    if pa is not None:
+        arrow_table = pa.Table.from_pandas(index.table, preserve_index=False)
+        values = pa.FixedSizeBinaryArray.from_buffers(pa.binary(16), len(index.ip_keys),
+                                                      [None, pa.py_buffer(np.ascontiguousarray(index.ip_keys).tobytes())])
+        arrow_table = arrow_table.append_column('_ip_keys', pa.ListArray.from_arrays(pa.array(index.ip_offsets, pa.int64()),
+                                                                                      values).cast(pa.large_list(pa.binary(16))))
+        arrow_table = arrow_table.append_column('_id_order', pa.array(index.id_order.astype(np.int64)))
+        arrow_table = arrow_table.replace_schema_metadata({**(arrow_table.schema.metadata or {}),
+                                                          METADATA_KEY: json.dumps(fingerprint(csv_path)).encode()})
+        path = index_path(csv_path)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        feather.write_feather(arrow_table, temp_path)
+        os.replace(temp_path, path) # Readers never see a partial index file
+    return index
+
+
+def load_assets(csv_path, rebuild=False):
+    '''
+        > Function: returns the AssetIndex of an assets export, loading its saved index if it still matches the CSV
+                    (same modification time & size, or same content hash) and rebuilding it otherwise.
+    '''
+    path = index_path(csv_path)
+    if rebuild or pa is None or not os.path.isfile(path):
+        return build_index(csv_path)
+    arrow_table = feather.read_table(path, memory_map=True)
+    saved = json.loads((arrow_table.schema.metadata or {}).get(METADATA_KEY, b'{}'))
+    if os.path.isfile(fingerprint_path(csv_path)): # Refreshed fingerprint of a touched but unchanged CSV
+        with open(fingerprint_path(csv_path)) as f:
+            saved = json.load(f)
+    current = fingerprint(csv_path, with_hash=False)
+    if saved.get('version') != INDEX_VERSION:
+        return build_index(csv_path)
+    if (saved.get('mtime'), saved.get('size')) != (current['mtime'], current['size']):
+        if saved.get('size') != current['size'] or saved.get('sha1') != file_hash(csv_path):
+            return build_index(csv_path)
+        # Touched but unchanged CSVs keep their index, the new modification time is recorded so it's hashed only once:
+        temp_path = f'{fingerprint_path(csv_path)}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({**saved, 'mtime': current['mtime']}, f)
+        os.replace(temp_path, fingerprint_path(csv_path))
+    arrow_table = arrow_table.combine_chunks() # One chunk per column keeps row lookups fast
+    ip_lists = pa.concat_arrays(arrow_table.column('_ip_keys').chunks) if arrow_table.num_rows else None
+    if ip_lists is None:
+        ip_offsets, ip_keys = np.zeros(1, dtype=np.int64), np.zeros(0, dtype='S16')
+    else:
+        ip_offsets = np.asarray(ip_lists.offsets, dtype=np.int64)
+        ip_offsets = ip_offsets - ip_offsets[0]
+        values = ip_lists.flatten()
+        ip_keys = np.frombuffer(values.buffers()[1], dtype='S16', count=len(values), offset=values.offset * 16)
+    id_order = arrow_table.column('_id_order').to_numpy()
+    return AssetIndex(arrow_table.drop_columns(['_ip_keys', '_id_order']).to_pandas(), ip_offsets, ip_keys, id_order)
@@ -1,5 +1,6 @@
 '''
 This script provides info on any asset in Nexpose DB using the asset's hostname, IP, or ID.
+Hostnames can also be fuzzy searched (closest hostnames within a few typos), one at a time or from a .txt file.
 
 __author__ = xVolkov
 __github__ = https://github.com/xVolkov
@@ -13,6 +14,8 @@ import numpy as np
 import csv
 import os
 import sys
+from datetime import datetime
+from asset_index import load_assets, FUZZY_DISTANCE, FUZZY_LIMIT
 
 def drop_domain(in_name):
     '''
@@ -25,28 +28,24 @@ def drop_domain(in_name):
     return out_name
 
 # USE THIS FILE TO LOOKUP ASSETS IN NEXPOSE
-assets = pd.read_csv('C:/Data/All_Assets_Scanned.csv')  # Change to match your all assets file
-
-# Filtering 'assets' dataframe:
-assets['host_name'] = assets['host_name'].apply(drop_domain) # dropping domains on 'host_name' column
-assets = assets.sort_values('host_name', ascending=True) # sorting 'host_name' column
-assets['host_name'] = assets['host_name'].str.lower() # lower-casing all data in 'host_name' column
-assets['ip_address_all'] = assets['ip_address_all'].apply(lambda x: x.split(', ')) # splits multiple IPs in 'ip_address_all'
-assets = assets.explode('ip_address_all') # assigns each IP to its own row
+ASSETS_CSV = 'C:/Data/All_Assets_Scanned.csv' # Change to match your all assets file
+index = load_assets(ASSETS_CSV) # Loads the prebuilt asset index (rebuilt only when the .csv file changes)
+assets = index.table # Normalized 'assets' dataframe (domains dropped, lower-cased host names, one row per asset)
 print('assets size: ',assets.shape[0])
 
 x = 1
 while x == 1: 
     search = input("\n############################################################\n"+
                    "Please select one of the following options ('0' to exit):\n1) Search by IP address\n" +
-                       "2) Search by hostname\n3) Search by asset ID\n")
+                       "2) Search by hostname\n3) Search by asset ID\n4) Fuzzy search by hostname\n" +
+                       "5) Fuzzy search a list of hostnames (.txt file)\n")
 
     if search == '1': # user is searching by asset IP address
         asset_ip = input("Please enter the asset's IP address: ")
         while not asset_ip:
             print("Invalid input!")
             asset_ip = input("Please enter the asset's IP address: ")
-        found_ip = assets[assets.ip_address_all.str.contains(asset_ip)] # stores assets matched using provided IP
+        found_ip = index.find_ip(asset_ip) # stores assets matched using provided IP (binary search over the IP index)
         print('\n',found_ip)
         
     elif search == '2': # user is searching by asset hostname
@@ -56,7 +55,7 @@ while x == 1:
             asset_hostname = input("Please enter the asset's hostname: ")
         asset_hostname = asset_hostname.lower() # Lower-cases the user input
         asset_hostname = drop_domain(asset_hostname) # Applies drop_domain function on the user input
-        found_hostname = assets[assets.host_name.str.contains(asset_hostname, na=False)] # stores assets matched using provided hostname
+        found_hostname = index.find_hostname(asset_hostname, 'substring') # stores assets whose hostname contains the provided one (literal match, trigram index)
         print('\n',found_hostname)
         
     elif search == '3': # user is searching by asset ID
@@ -64,12 +63,43 @@ while x == 1:
         while not asset_id:
             print("Invalid input!")
             asset_id = input("Please enter the asset's ID: ")
-        found_id = assets.loc[assets['asset_id'] == int(asset_id)] # stores assets matched using provided asset ID
+        found_id = index.find_id(int(asset_id)) # stores assets matched using provided asset ID (binary search over the ID index)
         if 'Empty DataFrame' in str(found_id):
             print("\nAsset not found! Please check your input..")
         else:
             print('\n',found_id)
         
+    elif search == '4' or search == '5': # user is searching for hostnames close to the provided one(s)
+        max_distance = input(f"Please enter the maximum edit distance (default {FUZZY_DISTANCE}): ").strip()
+        max_distance = int(max_distance) if max_distance.isdigit() else FUZZY_DISTANCE
+        if search == '4':
+            asset_hostname = input("Please enter the asset's hostname: ")
+            while not asset_hostname:
+                print("Invalid input!")
+                asset_hostname = input("Please enter the asset's hostname: ")
+            asset_hostname = drop_domain(asset_hostname.lower()) # Lower-cases the user input & applies drop_domain
+            found_similar = index.find_similar(asset_hostname, max_distance, FUZZY_LIMIT) # closest hostnames first
+            if found_similar.empty:
+                print(f"\nNo hostname within {max_distance} edit(s) of '{asset_hostname}'..")
+            else:
+                print('\n',found_similar)
+        else:
+            hn_file = input("Please enter file path to your .txt file containing "+
+                            "all asset hostnames (have each hostname seaparated by a newline): \n")
+            if not os.path.isfile(hn_file):
+                print("\nInvalid input! File Does not exist!")
+                continue
+            with open(hn_file) as file: # Reads the whole file once, lower-casing & dropping domains
+                hostnames = list(dict.fromkeys(drop_domain(line.strip().lower()) for line in file if line.strip()))
+            found_similar, misses = index.find_similar_many(hostnames, max_distance, FUZZY_LIMIT)
+            date_str = datetime.now().strftime("%m-%d-%Y_T%H-%M-%S") # Creating date-time string
+            os.makedirs('Output/Fuzzy Matches', exist_ok=True)
+            found_similar.to_csv(f'Output/Fuzzy Matches/{date_str}.csv', index=False) # Saving results
+            print(f"All done! {len(hostnames) - len(misses)} of {len(hostnames)} hostname(s) matched, "
+                  f"results were saved to '/Output/Fuzzy Matches/{date_str}.csv'")
+            if misses:
+                print(f"No match for: {', '.join(misses[:20])}{' ...' if len(misses) > 20 else ''}")
+
     elif search =='0': # user chose to exit the program
         print("Exiting program..")
         sys.exit()
\ No newline at end of file
@@ -0,0 +1,123 @@
+'''
+Copyright (c) 2022, Volkovx
+All rights reserved.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+This module turns a short filter expression into a Nexpose asset search and streams the matching asset IDs from the
+console's '/assets/search' endpoint page by page, so tag jobs can target "all Windows servers in site 12" without
+exporting and filtering 'All_Assets.csv' first. Only asset IDs are kept from the search results.
+
+Filter expressions are clauses separated by ';', all of them must match (or any of them with match='any'):
+    site=12,14          site ID is one of the listed IDs        site!=12        site ID is none of them
+    os~windows          OS name contains the text               os!~linux       OS name doesn't contain it
+    ip=10.0.0.0/24      IP in a CIDR block, 'a-b' range or IP   ip!=10.0.0.5    IP outside of it
+    host=web*           hostname matches a '*' wildcard pattern host!=web*      hostname doesn't match it
+    host~db             hostname contains the text              host!~test      hostname doesn't contain it
+e.g. "site=12; os~windows server; host=*.corp.local"
+
+__author__ = xVolkov
+__github__ = https://github.com/xVolkov
+__date__ = 10/18/2026
+__version__ = 1.0
+'''
+
+import re
+from target_index import parse_target, int_to_ip
+
+SEARCH_PATH = '/assets/search' # Nexpose asset search endpoint (POST).
+MATCHES = ('all', 'any') # Whether every filter or any filter must match.
+CLAUSE = re.compile(r'^\s*(site|os|ip|host)\s*(!=|!~|=|~)\s*(.+?)\s*$', re.IGNORECASE) # 'field operator value'
+
+
+def site_filter(operator, value):
+    '''
+        > Function: builds a 'site-id' search filter out of a comma-separated list of site IDs.
+    '''
+    if operator not in ('=', '!='):
+        raise Exception(f"Site filters take '=' or '!=', got 'site{operator}{value}'")
+    ids = [v.strip() for v in value.split(',') if v.strip()]
+    if not ids or not all(v.isdigit() for v in ids):
+        raise Exception(f"Invalid site ID list '{value}'")
+    return {'field': 'site-id', 'operator': 'in' if operator == '=' else 'not-in', 'values': [int(v) for v in ids]}
+
+
+def os_filter(operator, value):
+    '''
+        > Function: builds an 'operating-system' search filter (OS name contains / doesn't contain the text).
+    '''
+    if operator not in ('~', '!~'):
+        raise Exception(f"OS filters take '~' or '!~' (contains), got 'os{operator}{value}'")
+    return {'field': 'operating-system', 'operator': 'contains' if operator == '~' else 'does-not-contain',
+            'value': value}
+
+
+def ip_filter(operator, value):
+    '''
+        > Function: builds an 'ip-address' search filter out of a single IP, a CIDR block or an 'a-b' range.
+    '''
+    if operator not in ('=', '!='):
+        raise Exception(f"IP filters take '=' or '!=', got 'ip{operator}{value}'")
+    interval = parse_target(value.replace(' ', '').replace('-', ' - ')) # Same parsing as site targets.
+    if interval is None:
+        raise Exception(f"Invalid IP, CIDR block or range '{value}'")
+    start, end = int_to_ip(interval[0]), int_to_ip(interval[1])
+    if start == end:
+        return {'field': 'ip-address', 'operator': 'is' if operator == '=' else 'is-not', 'value': start}
+    return {'field': 'ip-address', 'operator': 'in-range' if operator == '=' else 'not-in-range',
+            'lower': start, 'upper': end}
+
+
+def host_filter(operator, value):
+    '''
+        > Function: builds a 'host-name' search filter. '*' wildcards at either end map to the console's
+                    starts-with/ends-with/contains operators, any other pattern is sent as an anchored regex.
+    '''
+    if operator in ('~', '!~'):
+        return {'field': 'host-name', 'operator': 'contains' if operator == '~' else 'does-not-contain',
+                'value': value}
+    text = value.strip('*')
+    if '*' not in value:
+        return {'field': 'host-name', 'operator': 'is' if operator == '=' else 'is-not', 'value': value}
+    if operator == '=' and text and '*' not in text:
+        if value.startswith('*') and value.endswith('*'):
+            return {'field': 'host-name', 'operator': 'contains', 'value': text}
+        return {'field': 'host-name', 'operator': 'ends-with' if value.startswith('*') else 'starts-with',
+                'value': text}
+    pattern = '^' + '.*'.join(re.escape(part) for part in value.split('*')) + '$'
+    return {'field': 'host-name', 'operator': 'is-like' if operator == '=' else 'not-like', 'value': pattern}
+
+
+FILTERS = {'site': site_filter, 'os': os_filter, 'ip': ip_filter, 'host': host_filter} # Stores {field : builder}
+
+
+def parse_filters(expression):
+    '''
+        > Function: parses a filter expression (see the module docstring) into Nexpose search filters.
+        > Output: list of filter dicts for the '/assets/search' body.
+    '''
+    filters = []
+    for clause in expression.split(';'):
+        if not clause.strip():
+            continue
+        match = CLAUSE.match(clause)
+        if match is None:
+            raise Exception(f"Invalid filter '{clause.strip()}', expected e.g. 'site=12', 'os~windows', "
+                            "'ip=10.0.0.0/24' or 'host=web*'")
+        field, operator, value = match.groups()
+        filters.append(FILTERS[field.lower()](operator, value))
+    if not filters:
+        raise Exception('Empty filter expression')
+    return filters
+
+
+def search_asset_ids(client, filters, match='all', page_size=None):
+    '''
+        > Function: generator that streams the IDs of every asset matching the search filters, page by page.
+        > Input: the shared NexposeClient, filter dicts (see 'parse_filters'), 'all' or 'any' and an optional page size.
+    '''
+    if match not in MATCHES:
+        raise Exception(f"Unknown match '{match}', expected one of {MATCHES}")
+    for asset in client.iter_search(SEARCH_PATH, {'filters': filters, 'match': match}, page_size=page_size):
+        yield asset['id']
@@ -12,6 +12,7 @@ import os
 import csv
 import json
 import sys
+import argparse
 from timeit import default_timer as timer
 import netaddr
 import ipaddress
@@ -29,18 +30,25 @@ import urllib3
 import requests
 from tqdm import tqdm
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
+from nexpose_client import NexposeClient, POOL_SIZE, TIMEOUT, PAGE_SIZE, CONCURRENCY
+from itertools import chain
+from journal import Journal, journal_path
+from asset_search import parse_filters, search_asset_ids
+from tag_engine import TagEngine, TagCatalog, read_asset_ids, summarize, plan_sync, print_plan
 
 
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning) # Disable cert warnings
 
 class Main:
-    def __init__(self, host=None, auth=None, tag_name=None):
+    def __init__(self, host=None, auth=None, tag_name=None, pool_size=POOL_SIZE, timeout=TIMEOUT,
+                 page_size=PAGE_SIZE, concurrency=CONCURRENCY, resume=False):
         '''
             > Function: python class constructor, includes all class attributes
         '''
         self.auth = auth # Stores encoded user credentials.
         self.host = host # Stores chosen host URL.
         self.tag_name = tag_name
+        self.resume = resume # Stores whether tag jobs pick up their journal and skip assets already done.
         
         valid_hosts = {
                 '1':['prod','LINK TO YOUR PRODUCTION API SERVER'],
@@ -64,6 +72,10 @@ class Main:
             self.auth = (user, passw) # Saves user credentials as a Nexpose class attributes (as a tuple).
         else:
             self.auth = auth 
+        self.client = NexposeClient(self.host, self.auth, pool_size=max(pool_size, concurrency), timeout=timeout,
+                                        page_size=page_size) # Shared pooled HTTP client.
+        self.engine = TagEngine(self.client, workers=concurrency) # Concurrent bulk tag/untag engine.
+        self.tags = TagCatalog(self.client) # Session-wide tag catalog, fetched once & indexed by ID and name.
             
         self.test_connection()
             
@@ -77,9 +89,7 @@ class Main:
         '''
             > Function: tests user connection to chosen host
         '''
-        url = f"{self.host}/sites"
-        response = requests.get(url, auth=(self.auth[0],b64d(self.auth[1]).decode()), params={'page':0, 'size':1},
-                                verify=False)
+        response = self.client.get("/sites", params={'page':0, 'size':1})
         try:
             response.raise_for_status()
         except:
@@ -87,333 +97,186 @@ class Main:
             
     def get_tags(self):
         '''
-            > Function: gets all tags in Nexpose
+            > Function: gets all tags in Nexpose (from the session's tag catalog)
         '''
-        response = requests.get(self.host + f"/tags", auth=self.get_auth(), params={'size': 500}, verify=False)
-        return response.json()['resources']
+        return self.tags.tags()
     
     def get_tag_id(self, tag_name): 
         '''
-            > Function: gets specified tag ID by looking-up the tag's name
+            > Function: gets specified tag ID by looking-up the tag's name, returns a '{Tag name : Tag ID}' dict
+                        (empty if the tag doesn't exist)
         '''
-        tag_name = tag_name
-        tag_dict = {}
-        for tag in self.get_tags(): # Looks-up tag id by its name
-            if tag['name'] == f'{tag_name}':
-                tag_dict.update({tag['name']:tag['id']})
-        print("This function returns a Python dict in '{Tag name : Tag ID}' format..")
-        return tag_dict
+        tag = self.tags.find(tag_name, 'name')
+        return {tag['name']: tag['id']} if tag is not None else {}
 
     def get_tagged_assets(self, tag_id):
-        response = requests.get(self.host + f"/tags/{tag_id}/assets", auth=self.get_auth(),
-                                    params={'size' : 500}, verify=False)
-        return (response.json())
-
-
-##### Code Runner ####
-
-asset_id = None
-tag_id = None
-tag_name = None
-
-main = Main()
-x = 1
-while x == 1:
-    id_file = input("\nPlease enter file path to your .txt file including "+
-                         "all asset IDs you'd like to tag (have each ID seaparated by a newline): \n")
-    search = input("\n############################################################\n"+
-                   "Please select one of the following options ('0' to exit):\n1) Tag assets using a tag ID\n" +
-                       "2) Tag assets using a tag name\n" + "3) Untag assets using a tag ID\n" +
-                       "4) Untag assets using a tag name\n")
-
-    if search == '1': # OPTION 1) TAG ASSETS USING TAG ID
-        tag_id = input("Please enter the tag id: \n") #Stores tag id used to tag the asset
-        tag_id = int(tag_id)
-        if (os.path.isfile(id_file)) == True:
-
-            if id_file.endswith('.txt'):
-                output = pd.DataFrame() # Empty dataframe which will contain all results
-                print('\nFile found! Processing data.. \n')
-                file = open(id_file)
-                file_content = file.read() # Reads the contents of the input file
-                lines = file_content.split('\n') # Splits entries using the newline character as a delimiter
-                log = [] # List storing asset IDs and their tags
-                    
-                response = requests.get(main.host + f"/tags", auth=main.get_auth(), params={'size': 500}, verify=False)
-                all_tags = response.json()['resources']
-                if response.json()['page']['totalPages'] > 1:
-                    for page in range(1,response.json()['page']['totalPages']):
-                        response = requests.get(url, auth=self.get_auth(), params={'page':page, 'size':500}, verify=False)
-                        response.raise_for_status()
-                        all_tags = all_tags + response.json()['resources']
-
-                for tag in all_tags: # Looks-up tag id by its name
-                    if tag['id'] == tag_id:
-                        print('Tag found! \n')
-                        print(f"Tag Name: {tag['name']}")
-                        print(f"Tag ID: {tag['id']} \n")
-                        tag_id = tag['id']
-                        
-                        proceed = input(f"Would you like to tag your assets with tag {tag_id} (y/n)?\n")
-                
-                for asset_id in lines:
-                    if 'y' in proceed:
-                        pass
-                    elif 'n' in proceed:
-                        print("Exiting program..")
-                        sys.exit()
-                    else:
-                        print("Exiting program..")
-                        sys.exit()
-                        
-                    if tag_id == None:
-                        print("Tag not found! Exiting program..")
-                        sys.exit()
-                    else:
-                        response = requests.put(main.host + f"/assets/{asset_id}/tags/{tag_id}", auth=main.get_auth(),
-                                                verify=False)
-                        log.append(f"Asset ID {asset_id} successfully tagged with tag {tag_id}\n")  
-                        print('\n')
-                        print(response.json())
-                        print('\n')
-
-                now = datetime.now()
-                date_str = now.strftime("%m-%d-%Y_T%H-%M-%S") # Gets date and time
-                log_output = f'Output/AssetsTagged_Log({date_str}).txt' # Log output file destination
-                try: # Saving log as a .txt file
-                    with open(log_output, 'w') as f:
-                        f.write('Assets Tagged Summary:\n\n')
-                        for item in log:
-                            f.write("%s\n" % item)
-                except IOError:
-                    print('I/O error')
-
-                #output.to_csv(f'Output/Asset IDs/{date_str}.csv', index=False) # Saving results
-                print("All done! Results were saved to 'Output' directory")
-
-            else:
-                print("\nInvalid input! File is not a .txt!")
-
-        else:
-            print("\nInvalid input! File Does not exist!")
-
-
-    elif search == '2': # OPTION 2) TAG ASSETS USING TAG NAME 
-        tag_name = input("Please enter the tag name: \n") #Stores tag id used to tag the asset
-        
-        if (os.path.isfile(id_file)) == True:
-
-            if id_file.endswith('.txt'):
-                output = pd.DataFrame() # Empty dataframe which will contain all results
-                print('\nFile found! Processing data.. \n')
-                file = open(id_file)
-                file_content = file.read() # Reads the contents of the input file
-                lines = file_content.split('\n') # Splits entries using the newline character as a delimiter
-                log = [] # List storing asset IDs and their tags
-
-                response = requests.get(main.host + f"/tags", auth=main.get_auth(), params={'size': 500}, verify=False)
-                all_tags = response.json()['resources']
-                if response.json()['page']['totalPages'] > 1:
-                    for page in range(1,response.json()['page']['totalPages']):
-                        response = requests.get(url, auth=self.get_auth(), params={'page':page, 'size':500}, verify=False)
-                        response.raise_for_status()
-                        all_tags = all_tags + response.json()['resources']
-
-                for tag in all_tags: # Looks-up tag id by its name
-                    if tag['name'] == f'{tag_name}':
-                        print('Tag found! \n')
-                        print(f"Tag Name: {tag['name']}")
-                        print(f"Tag ID: {tag['id']} \n")
-                        tag_id = tag['id']
-                        
-                        proceed = input(f"Would you like to tag your assets with tag {tag_id} (y/n)?\n")
-                
-                for asset_id in lines:
-                    if 'y' in proceed:
-                        pass
-                    elif 'n' in proceed:
-                        print("Exiting program..")
-                        sys.exit()
-                    else:
-                        print("Exiting program..")
-                        sys.exit()
-                        
-                    if tag_id == None:
-                        print("Tag not found! Exiting program..")
-                        sys.exit()
-                    else:
-                        response = requests.put(main.host + f"/assets/{asset_id}/tags/{tag_id}", auth=main.get_auth(),
-                                                verify=False)
-                        log.append(f"Asset ID {asset_id} successfully tagged with tag {tag_id}\n")  
-                        print('\n')
-                        print(response.json())
-                        print('\n')
-
-                now = datetime.now()
-                date_str = now.strftime("%m-%d-%Y_T%H-%M-%S") # Gets date and time
-                log_output = f'Output/AssetsTagged_Log({date_str}).txt' # Log output file destination
-                try: # Saving log as a .txt file
-                    with open(log_output, 'w') as f:
-                        f.write('Assets Tagged Summary:\n\n')
-                        for item in log:
-                            f.write("%s\n" % item)
-                except IOError:
-                    print('I/O error')
-
-                #output.to_csv(f'Output/Asset IDs/{date_str}.csv', index=False) # Saving results
-                print("All done! Results were saved to 'Output' directory")
-
-            else:
-                print("\nInvalid input! File is not a .txt!")
-
-        else:
-            print("\nInvalid input! File Does not exist!")
-    
-    
-    elif search =='3': # OPTION 3) UNTAG ASSETS USING TAG ID
-        tag_id = input("Please enter the tag id: \n") #Stores tag id used to tag the asset
-        tag_id = int(tag_id)
-        if (os.path.isfile(id_file)) == True:
-
-            if id_file.endswith('.txt'):
-                output = pd.DataFrame() # Empty dataframe which will contain all results
-                print('\nFile found! Processing data.. \n')
-                file = open(id_file)
-                file_content = file.read() # Reads the contents of the input file
-                lines = file_content.split('\n') # Splits entries using the newline character as a delimiter
-                log = [] # List storing asset IDs and their tags
-                    
-                response = requests.get(main.host + f"/tags", auth=main.get_auth(), params={'size': 500}, verify=False)
-                all_tags = response.json()['resources']
-                if response.json()['page']['totalPages'] > 1:
-                    for page in range(1,response.json()['page']['totalPages']):
-                        response = requests.get(url, auth=self.get_auth(), params={'page':page, 'size':500}, verify=False)
-                        response.raise_for_status()
-                        all_tags = all_tags + response.json()['resources']
-
-                for tag in all_tags: # Looks-up tag id by its name
-                    if tag['id'] == tag_id:
-                        print('Tag found! \n')
-                        print(f"Tag Name: {tag['name']}")
-                        print(f"Tag ID: {tag['id']} \n")
-                        tag_id = tag['id']
-                        
-                        proceed = input(f"Would you like to remove tag {tag_id} from your assets (y/n)?\n")
-                
-                for asset_id in lines:
-                    if 'y' in proceed:
-                        pass
-                    elif 'n' in proceed:
-                        print("Exiting program..")
-                        sys.exit()
-                    else:
-                        print("Exiting program..")
-                        sys.exit()
-                        
-                    if tag_id == None:
-                        print("Tag not found! Exiting program..")
-                        sys.exit()
-                    else:
-                        response = requests.delete(main.host + f"/assets/{asset_id}/tags/{tag_id}", auth=main.get_auth(),
-                                                verify=False)
-                        log.append(f"Tag {tag_id} successfully removed from asset {asset_id}\n")  
-                        print('\n')
-                        print(response.json())
-                        print('\n')
-
-                now = datetime.now()
-                date_str = now.strftime("%m-%d-%Y_T%H-%M-%S") # Gets date and time
-                log_output = f'Output/AssetsTagged_Log({date_str}).txt' # Log output file destination
-                try: # Saving log as a .txt file
-                    with open(log_output, 'w') as f:
-                        f.write('Assets Untagged Summary:\n\n')
-                        for item in log:
-                            f.write("%s\n" % item)
-                except IOError:
-                    print('I/O error')
+        '''
+            > Function: gets a tag's current members, returns {asset ID : sources} ('tag' for assets tagged directly,
+                        'criteria' for assets matched by the tag's search criteria)
+        '''
+        self.client.clear_cache() # Membership may have changed in the console since an earlier plan (e.g. a dry-run).
+        return {asset['id']: set(asset.get('sources') or ['tag'])
+                for asset in self.client.iter_resources(f"/tags/{tag_id}/assets")} # Walks every page of members.
 
-                #output.to_csv(f'Output/Asset IDs/{date_str}.csv', index=False) # Saving results
-                print("All done! Results were saved to 'Output' directory")
+    def find_tag(self, value, lookup='name'):
+        '''
+            > Function: finds a tag by its ID (lookup 'id') or its name (lookup 'name'), returns the tag or None.
+        '''
+        return self.tags.find(value, lookup)
 
-            else:
-                print("\nInvalid input! File is not a .txt!")
+    def search_assets(self, expression, match='all'):
+        '''
+            > Function: generator that streams the IDs of every asset matching a filter expression (e.g.
+                        "site=12; os~windows") from the console's asset search, see 'asset_search.py' for the syntax.
+        '''
+        return search_asset_ids(self.client, parse_filters(expression), match)
 
-        else:
-            print("\nInvalid input! File Does not exist!")
-            
-    
-    elif search == '4': # OPTION 4) UNTAG ASSETS USING TAG NAME
-        tag_name = input("Please enter the tag name: \n") #Stores tag id used to tag the asset
-        
-        if (os.path.isfile(id_file)) == True:
+    def run_jobs(self, tag_id, jobs, total=None, job=None):
+        '''
+            > Function: runs tag jobs ([(action, asset IDs)], action 'tag' or 'untag') through the tag engine, prints the
+                        summary and saves every asset's outcome to 'Output/AssetsTagged_Log(<date>).csv'. When a job
+                        key is given (e.g. ('tag', tag ID, mode, input file)), every outcome is also appended to the
+                        job's journal as it completes, and a resumed job skips the assets it already finished.
+            > Output: the outcomes dataframe.
+        '''
+        start = timer()
+        journal = Journal(journal_path(*job), resume=self.resume) if job else None
+        if journal is not None:
+            print(f"Journal: '{journal.path}'" + (f" ({journal.resumed} unit(s) from the previous run)"
+                                                  if journal.resumed else ''))
+        try:
+            outcomes = chain.from_iterable(self.engine.run(action, tag_id, asset_ids, journal)
+                                           for action, asset_ids in jobs)
+            outcomes = summarize(tqdm(outcomes, total=total, unit=' assets'))
+            if journal is not None:
+                journal.complete() # The job ran to the end, a later '--resume' starts over.
+        finally:
+            if journal is not None:
+                journal.close()
+        print(f"Finished in {timer() - start:.1f}s")
+        date_str = datetime.now().strftime("%m-%d-%Y_T%H-%M-%S") # Gets date and time
+        log_output = f'Output/AssetsTagged_Log({date_str}).csv' # Log output file destination
+        try: # Saving the outcomes as a .csv file
+            outcomes.to_csv(log_output, index=False)
+            print("All done! Results were saved to 'Output' directory")
+        except IOError:
+            print('I/O error')
+        return outcomes
+
+    def tag_assets(self, action, tag_id, asset_ids):
+        '''
+            > Function: adds (action 'tag') or removes (action 'untag') a tag on every asset ID, without checking
+                        the tag's current members first.
+        '''
+        return self.run_jobs(tag_id, [(action, asset_ids)])
 
-            if id_file.endswith('.txt'):
-                output = pd.DataFrame() # Empty dataframe which will contain all results
-                print('\nFile found! Processing data.. \n')
-                file = open(id_file)
-                file_content = file.read() # Reads the contents of the input file
-                lines = file_content.split('\n') # Splits entries using the newline character as a delimiter
-                log = [] # List storing asset IDs and their tags
+    def plan_tag(self, tag_id, asset_ids, mode='add'):
+        '''
+            > Function: fetches a tag's current members once and plans the tag/untag calls that reconcile them with the
+                        listed asset IDs (see 'plan_sync' for the modes), prints the plan and returns it.
+        '''
+        plan = plan_sync(self.get_tagged_assets(tag_id), asset_ids, mode)
+        print_plan(tag_id, plan)
+        return plan
 
-                response = requests.get(main.host + f"/tags", auth=main.get_auth(), params={'size': 500}, verify=False)
-                all_tags = response.json()['resources']
-                if response.json()['page']['totalPages'] > 1:
-                    for page in range(1,response.json()['page']['totalPages']):
-                        response = requests.get(url, auth=self.get_auth(), params={'page':page, 'size':500}, verify=False)
-                        response.raise_for_status()
-                        all_tags = all_tags + response.json()['resources']
+    def apply_plan(self, tag_id, plan, job=None):
+        '''
+            > Function: sends only the tag/untag calls of a sync plan (journaled under the job key if given), returns
+                        the outcomes dataframe.
+        '''
+        return self.run_jobs(tag_id, [('tag', plan['tag']), ('untag', plan['untag'])],
+                             total=len(plan['tag']) + len(plan['untag']), job=job)
 
-                for tag in all_tags: # Looks-up tag id by its name
-                    if tag['name'] == f'{tag_name}':
-                        print('Tag found! \n')
-                        print(f"Tag Name: {tag['name']}")
-                        print(f"Tag ID: {tag['id']} \n")
-                        tag_id = tag['id']
-                        
-                        proceed = input(f"Would you like to remove tag {tag_id} from your assets (y/n)?\n")
-                
-                for asset_id in lines:
-                    if 'y' in proceed:
-                        pass
-                    elif 'n' in proceed:
-                        print("Exiting program..")
-                        sys.exit()
-                    else:
-                        print("Exiting program..")
-                        sys.exit()
-                        
-                    if tag_id == None:
-                        print("Tag not found! Exiting program..")
-                        sys.exit()
-                    else:
-                        response = requests.delete(main.host + f"/assets/{asset_id}/tags/{tag_id}", auth=main.get_auth(),
-                                                verify=False)
-                        log.append(f"Tag {tag_id} successfully removed from asset {asset_id}\n")  
-                        print('\n')
-                        print(response.json())
-                        print('\n')
+    def sync_tag(self, tag_id, asset_ids, mode='add', dry_run=False):
+        '''
+            > Function: reconciles a tag's membership with the listed asset IDs, only the needed calls are sent.
+            > Output: the sync plan (dry-run or nothing to do) or the outcomes dataframe.
+        '''
+        plan = self.plan_tag(tag_id, asset_ids, mode)
+        if dry_run or not (plan['tag'] or plan['untag']):
+            return plan
+        return self.apply_plan(tag_id, plan)
 
-                now = datetime.now()
-                date_str = now.strftime("%m-%d-%Y_T%H-%M-%S") # Gets date and time
-                log_output = f'Output/AssetsTagged_Log({date_str}).txt' # Log output file destination
-                try: # Saving log as a .txt file
-                    with open(log_output, 'w') as f:
-                        f.write('Assets Tagged Summary:\n\n')
-                        for item in log:
-                            f.write("%s\n" % item)
-                except IOError:
-                    print('I/O error')
 
-                #output.to_csv(f'Output/Asset IDs/{date_str}.csv', index=False) # Saving results
-                print("All done! Results were saved to 'Output' directory")
+##### Code Runner ####
 
-            else:
-                print("\nInvalid input! File is not a .txt!")
+# Stores {menu option : (sync mode, how the tag is looked-up)}:
+OPTIONS = {'1': ('add', 'id'), '2': ('add', 'name'), '3': ('remove', 'id'), '4': ('remove', 'name'),
+           '5': ('exact', 'id'), '6': ('exact', 'name'), '7': (None, 'name')}
+CRITERIA_MODES = {'1': 'add', '2': 'remove', '3': 'exact'} # Stores {criteria mode option : sync mode}
 
-        else:
-            print("\nInvalid input! File Does not exist!")
+parser = argparse.ArgumentParser(description='Tags/untags Nexpose assets in bulk.')
+parser.add_argument('--resume', action='store_true',
+                    help='continue interrupted tag jobs from their journal, skipping assets already done')
+args = parser.parse_args()
 
+main = Main(resume=args.resume)
+x = 1
+while x == 1:
+    search = input("\n############################################################\n"+
+                   "Please select one of the following options ('0' to exit):\n1) Tag assets using a tag ID\n" +
+                       "2) Tag assets using a tag name\n" + "3) Untag assets using a tag ID\n" +
+                       "4) Untag assets using a tag name\n" +
+                       "5) Sync a tag (by ID) to exactly the listed assets\n" +
+                       "6) Sync a tag (by name) to exactly the listed assets\n" +
+                       "7) Tag/untag assets matching search criteria (site, OS, IP range, hostname)\n")
 
-    elif search =='0':
+    if search == '0':
         print("Exiting program..")
         sys.exit()
+    elif search not in OPTIONS:
+        print("\nInvalid input! Please select one of the listed options.")
+        continue
+    mode, lookup = OPTIONS[search]
+
+    if mode is None: # OPTION 7) Assets are found by the console's asset search instead of an ID file
+        expression = input("\nPlease enter the search criteria, e.g. 'site=12; os~windows server; ip=10.0.0.0/16; "
+                           "host=web*':\n")
+        try:
+            asset_ids = main.search_assets(expression)
+        except Exception as e:
+            print(f"\nInvalid input! {e}")
+            continue
+        mode = CRITERIA_MODES.get(input("1) Tag the matching assets\n2) Untag the matching assets\n" +
+                                        "3) Sync the tag to exactly the matching assets\n").strip())
+        if mode is None:
+            print("\nInvalid input! Please select one of the listed options.")
+            continue
+        source = expression # Identifies the job's journal
+        value = input("Please enter the tag name or ID: \n").strip()
+        if value.isdigit() and main.find_tag(value, 'id') is not None:
+            lookup = 'id'
+    else:
+        id_file = input("\nPlease enter file path to your .txt file including "+
+                             "all asset IDs you'd like to tag (have each ID seaparated by a newline): \n")
+        value = input(f"Please enter the tag {lookup}: \n").strip() # Stores tag id/name used to (un)tag the assets
+        if not os.path.isfile(id_file):
+            print("\nInvalid input! File Does not exist!")
+            continue
+        if not id_file.endswith('.txt'):
+            print("\nInvalid input! File is not a .txt!")
+            continue
+        asset_ids = read_asset_ids(id_file)
+        source = os.path.abspath(id_file) # Identifies the job's journal
+
+    tag = main.find_tag(value, lookup)
+    if tag is None:
+        print("Tag not found! Exiting program..")
+        sys.exit()
+    print('Tag found! \n')
+    print(f"Tag Name: {tag['name']}")
+    print(f"Tag ID: {tag['id']} \n")
+
+    print('\nProcessing data.. \n')
+    try:
+        plan = main.plan_tag(tag['id'], asset_ids, mode) # Skips assets already in the desired state
+    except requests.RequestException as e:
+        print(f"\nUnable to query API. Request returned error - {e}")
+        continue
+    if not (plan['tag'] or plan['untag']):
+        print("Nothing to do, every listed asset is already in the desired state.")
+        continue
+    if 'y' not in input("\nWould you like to apply this plan (y/n)? ('n' is a dry-run, nothing is changed)\n"):
+        print("Dry-run only, no assets were changed.")
+        continue
+    main.apply_plan(tag['id'], plan, job=('tag', tag['id'], mode, source))
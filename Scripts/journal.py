@@ -0,0 +1,134 @@
+'''
+Copyright (c) 2022, Volkovx
+All rights reserved.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+This module is the append-only execution journal of long-running jobs ('asset_tagger.py' tag jobs and the per-site
+fetches of 'api_calls.py'). Every finished unit of work (e.g. one asset tagged, one site's schedules fetched) is
+written as one JSON line and flushed right away, so a job that dies half-way keeps its progress. Restarted with
+'--resume', a job reopens its journal and skips the units already done (per-site fetches get their recorded results
+back instead of calling the API again). A job that finishes writes a final 'complete' record, and resuming a
+completed journal starts it over like a new run. Without '--resume' the job's journal starts over.
+
+__author__ = xVolkov
+__github__ = https://github.com/xVolkov
+__date__ = 10/18/2026
+__version__ = 1.0
+'''
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+JOURNAL_DIR = 'Output/Journals' # Change to match your 'Output' directory
+COMPLETE = '$complete' # Unit of the record written once the whole job has finished.
+
+
+def journal_path(job, *inputs):
+    '''
+        > Function: returns the journal file of a job, e.g. journal_path('tag', tag_id, mode, id_file). The inputs are
+                    hashed into the file name so a resumed job only picks up the journal of the same work.
+    '''
+    key = hashlib.sha1(json.dumps([str(i) for i in inputs]).encode()).hexdigest()[:12] if inputs else 'run'
+    return os.path.join(JOURNAL_DIR, f'{job}_{key}.jsonl')
+
+
+def encode(value):
+    '''
+        > Function: JSON fallback for values json can't write (sets are kept as {'$set': [...]} to be read back as sets).
+    '''
+    if isinstance(value, (set, frozenset)):
+        return {'$set': sorted(value, key=str)}
+    if hasattr(value, 'item'): # numpy scalars
+        return value.item()
+    return str(value)
+
+
+def decode(value):
+    '''
+        > Function: JSON object hook turning {'$set': [...]} back into sets.
+    '''
+    return set(value['$set']) if len(value) == 1 and '$set' in value else value
+
+
+class Journal:
+    def __init__(self, path, resume=False):
+        '''
+        > Function: class constructor, opens (resume) or starts over (no resume) a job's journal.
+        > Input: journal file path and whether the units already recorded should be kept.
+
+        '''
+        self.path = path
+        self.entries = {} # Stores {unit : last recorded entry}
+        self._lock = threading.Lock() # Units finish on several worker threads.
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        line = ''
+        if resume and os.path.isfile(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line, object_hook=decode)
+                    except ValueError: # A line cut short by a crash, its unit is simply redone.
+                        continue
+                    self.entries[entry['unit']] = entry
+            if COMPLETE in self.entries: # The previous run finished, there is nothing to resume.
+                self.entries = {}
+                resume = False
+        self.resumed = len(self.entries) # Number of units recorded by earlier runs.
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+        if resume and line and not line.endswith('\n'): # Ends the cut line so the next record starts on its own.
+            self._file.write('\n')
+
+    def done(self, unit):
+        '''
+        > Function: checks whether a unit of work was completed (failed units are redone on resume).
+
+        '''
+        entry = self.entries.get(unit)
+        return entry is not None and entry.get('status') == 'done'
+
+    def result(self, unit):
+        '''
+        > Function: returns the result recorded with a completed unit (e.g. a site's fetched rows).
+
+        '''
+        return self.entries[unit].get('result')
+
+    def record(self, unit, status='done', **fields):
+        '''
+        > Function: appends one finished unit of work to the journal and flushes it to disk right away.
+
+        '''
+        entry = {'unit': unit, 'status': status, 'time': round(time.time(), 3), **fields}
+        line = json.dumps(entry, default=encode) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.entries[unit] = entry
+
+    def complete(self):
+        '''
+        > Function: marks the whole job as finished and closes the journal, a later '--resume' starts over.
+
+        '''
+        self.record(COMPLETE)
+        self.close()
+
+    def close(self):
+        '''
+        > Function: closes the journal file.
+
+        '''
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
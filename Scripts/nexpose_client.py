@@ -0,0 +1,248 @@
+'''
+Copyright (c) 2022, Volkovx
+All rights reserved.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+This module holds the HTTP client shared by every script's 'Main' class. It keeps one pooled keep-alive session per
+Nexpose host, builds the Basic auth header once, and exposes get/put/delete helpers that all API calls go through.
+List endpoints are read with 'iter_resources', which walks every page of a paged Nexpose response, and per-item
+calls (e.g. one request per site) are spread over a bounded thread pool with 'fan_out'. JSON GETs are memoized for
+the lifetime of the client, so a document such as '/sites/{id}' is fetched and parsed once per run no matter how many
+collectors ask for it (identical requests already in flight are waited on instead of being sent twice). An optional
+on-disk 'ResponseCache' (see response_cache.py) keeps bodies between runs and revalidates them with conditional requests.
+
+__author__ = xVolkov
+__github__ = https://github.com/xVolkov
+__date__ = 10/18/2026
+__version__ = 1.0
+'''
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from base64 import b64encode as b64e
+from base64 import b64decode as b64d
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.exceptions import InsecureRequestWarning
+
+requests.packages.urllib3.disable_warnings(InsecureRequestWarning) # Disable cert warnings
+
+POOL_SIZE = 10 # Max number of keep-alive connections kept open to the Nexpose host.
+TIMEOUT = (10, 300) # (connect, read) timeouts in seconds for every request.
+PAGE_SIZE = 500 # Number of resources requested per page from Nexpose list endpoints.
+CONCURRENCY = POOL_SIZE # Max number of per-item requests (e.g. per site) in flight at once.
+
+
+class NexposeClient:
+    def __init__(self, host: str, auth: tuple, pool_size: int = POOL_SIZE, timeout: tuple = TIMEOUT,
+                 page_size: int = PAGE_SIZE, memoize: bool = True, cache=None, offline: bool = False,
+                 verify: bool = False):
+        '''
+        > Function: class constructor, opens a pooled session against the Nexpose host.
+        > Input: API host URL, the (username, b64-encoded password) tuple stored by 'Main', pool size, timeouts,
+                 the default page size for list endpoints, whether JSON GETs are memoized, an optional on-disk
+                 'ResponseCache' and whether to serve every JSON GET from that cache without touching the network.
+
+        '''
+        self.host = host.rstrip('/') # Stores selected host URL.
+        self.timeout = timeout # Stores (connect, read) timeouts.
+        self.pool_size = pool_size # Stores max pooled connections, i.e. max requests in flight at once.
+        self.page_size = page_size # Stores default page size for list endpoints.
+        self.memoize = memoize # Stores whether 'get_json' responses are memoized.
+        self._memo = {} # Stores {(method, URL, params) : parsed JSON body}.
+        self._inflight = {} # Stores {(method, URL, params) : Future} for requests currently being sent.
+        self._memo_lock = threading.Lock()
+        self.cache = cache # Stores the optional on-disk response cache.
+        self.offline = offline # Stores whether JSON GETs are served from the on-disk cache only.
+        if offline and cache is None:
+            raise Exception('Offline mode needs an on-disk response cache.')
+        self.session = requests.Session()
+        # 'pool_block' makes callers wait for a free pooled connection, so 'pool_size' caps the requests in flight
+        # across every thread (fan_out workers, page prefetching, concurrent collectors) and no extra connections
+        # are opened and thrown away:
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.verify = verify
+        # Builds the Basic auth header once instead of decoding the password on every request:
+        token = b64e(f"{auth[0]}:{b64d(auth[1]).decode()}".encode()).decode()
+        self.session.headers.update({'Authorization': f'Basic {token}', 'Accept': 'application/json'})
+
+    def url(self, path: str) -> str:
+        '''
+        > Function: builds a full API URL out of a path such as '/sites/12' (full URLs are passed through).
+
+        '''
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f"{self.host}/{path.lstrip('/')}"
+
+    def get(self, path: str, params: dict = None) -> requests.Response:
+        '''
+        > Function: sends a GET request through the pooled session.
+
+        '''
+        return self.session.get(self.url(path), params=params, timeout=self.timeout)
+
+    def put(self, path: str, params: dict = None, json: dict = None) -> requests.Response:
+        '''
+        > Function: sends a PUT request through the pooled session.
+
+        '''
+        self.clear_cache() # A write may change any memoized document.
+        return self.session.put(self.url(path), params=params, json=json, timeout=self.timeout)
+
+    def post(self, path: str, params: dict = None, json: dict = None) -> requests.Response:
+        '''
+        > Function: sends a POST request through the pooled session.
+
+        '''
+        self.clear_cache() # A write may change any memoized document.
+        return self.session.post(self.url(path), params=params, json=json, timeout=self.timeout)
+
+    def delete(self, path: str, params: dict = None) -> requests.Response:
+        '''
+        > Function: sends a DELETE request through the pooled session.
+
+        '''
+        self.clear_cache() # A write may change any memoized document.
+        return self.session.delete(self.url(path), params=params, timeout=self.timeout)
+
+    def _fetch_json(self, path: str, params: dict = None) -> dict:
+        '''
+        > Function: sends a GET request, reports back errors/issues and returns the decoded JSON body.
+
+        '''
+        if self.cache is None:
+            response = self.get(path, params=params)
+            response.raise_for_status()
+            return response.json()
+        url = self.url(path)
+        entry = self.cache.lookup(url, params)
+        if entry is not None and (self.offline or self.cache.is_fresh(url, entry)):
+            return entry.json()
+        if self.offline:
+            raise Exception(f'Offline mode: no cached response for {url} {params or ""}')
+        headers = {} # Conditional request headers, lets the console answer '304 Not Modified'.
+        if entry is not None and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(url, params)
+            return entry.json()
+        response.raise_for_status()
+        self.cache.store(url, params, response.text, response.headers.get('ETag'),
+                         response.headers.get('Last-Modified'))
+        return response.json()
+
+    def get_json(self, path: str, params: dict = None) -> dict:
+        '''
+        > Function: returns the decoded JSON body of a GET request, memoized by (method, URL, params).
+                    Concurrent callers asking for the same request share one HTTP call. The returned body is
+                    shared between callers, so it must not be modified.
+
+        '''
+        if not self.memoize:
+            return self._fetch_json(path, params)
+        key = ('GET', self.url(path), tuple(sorted((params or {}).items())))
+        with self._memo_lock:
+            if key in self._memo:
+                return self._memo[key]
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner: # First caller sends the request, the others wait on its result.
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            body = self._fetch_json(path, params)
+        except BaseException as e:
+            with self._memo_lock:
+                del self._inflight[key]
+            future.set_exception(e) # Failed requests aren't memoized, a later call retries them.
+            raise
+        with self._memo_lock:
+            self._memo[key] = body
+            del self._inflight[key]
+        future.set_result(body)
+        return body
+
+    def clear_cache(self):
+        '''
+        > Function: drops every memoized response.
+
+        '''
+        with self._memo_lock:
+            self._memo.clear()
+
+    def _iter_pages(self, fetch, params: dict, size: int):
+        '''
+        > Function: generator shared by the paged endpoints. 'fetch' gets one page's JSON body from its query params;
+                    page 0 is fetched first, once it reports 'totalPages' the remaining pages are prefetched in
+                    parallel (bounded by the pool size) and their resources yielded in page order.
+
+        '''
+        first = fetch({**params, 'page': 0, 'size': size})
+        yield from first.get('resources', [])
+        total_pages = first.get('page', {}).get('totalPages', 1)
+        if total_pages <= 1:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.pool_size, total_pages - 1)) as executor:
+            pages = [executor.submit(fetch, {**params, 'page': page, 'size': size}) for page in range(1, total_pages)]
+            try:
+                for future in pages: # Yields pages in order as soon as each one is ready.
+                    yield from future.result().get('resources', [])
+            finally:
+                for future in pages: # Stops queued requests if the caller stops iterating early.
+                    future.cancel()
+
+    def iter_resources(self, path: str, params: dict = None, page_size: int = None):
+        '''
+        > Function: generator that lazily yields every resource of a paged Nexpose list endpoint.
+        > Input: endpoint path, extra query params and an optional page size (defaults to the client's page size).
+
+        '''
+        yield from self._iter_pages(lambda page: self.get_json(path, params=page), dict(params or {}),
+                                    page_size or self.page_size)
+
+    def iter_search(self, path: str, body: dict, params: dict = None, page_size: int = None):
+        '''
+        > Function: generator that lazily yields every resource of a paged POST search endpoint (e.g. '/assets/search'
+                    with a '{"filters": [...], "match": "all"}' body). Searches don't change any data, so memoized
+                    responses are kept and the results aren't memoized or cached.
+        > Input: endpoint path, JSON search body, extra query params and an optional page size.
+
+        '''
+        if self.offline:
+            raise Exception(f'Offline mode: searches need the console ({self.url(path)})')
+
+        def fetch(page):
+            response = self.session.post(self.url(path), params=page, json=body, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+
+        yield from self._iter_pages(fetch, dict(params or {}), page_size or self.page_size)
+
+    def fan_out(self, func, items, workers: int = CONCURRENCY) -> list:
+        '''
+        > Function: runs 'func' on every item over a bounded thread pool and returns results in the original item order.
+        > Input: a function taking one item (e.g. a site ID), the items and the max number of concurrent calls.
+
+        '''
+        items = list(items)
+        workers = max(1, min(workers, len(items)))
+        if workers == 1: # Nothing to parallelize, runs in the calling thread.
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(func, items)) # 'map' keeps results in input order.
+
+    def close(self):
+        '''
+        > Function: closes all pooled connections.
+
+        '''
+        self.session.close()
@@ -0,0 +1,63 @@
+'''
+Copyright (c) 2022, Volkovx
+All rights reserved.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+This module collects API rows ('data' dicts) into column buffers and builds each pandas dataframe once at the end,
+filling missing values and converting dtypes in a single vectorized step instead of appending row by row.
+
+__author__ = xVolkov
+__github__ = https://github.com/xVolkov
+__date__ = 10/18/2026
+__version__ = 1.0
+'''
+
+import pandas as pd
+
+
+class RecordBuilder:
+    def __init__(self, columns=()):
+        '''
+        > Function: class constructor.
+        > Input: optional column names, used to fix the column order of the built dataframe.
+
+        '''
+        self.columns = {name: [] for name in columns} # Stores {column name : list of values}.
+        self.length = 0 # Number of rows collected so far.
+
+    def append(self, data):
+        '''
+        > Function: adds one row. Keys not seen before become new columns, keys missing from the row get None.
+        > Input: a 'data' dict of {column name : value}.
+
+        '''
+        for key in data:
+            if key not in self.columns:
+                self.columns[key] = [None] * self.length # Back-fills the new column for earlier rows.
+        for key, values in self.columns.items():
+            values.append(data.get(key))
+        self.length += 1
+
+    def extend(self, rows):
+        '''
+        > Function: adds several rows (see 'append').
+
+        '''
+        for data in rows:
+            self.append(data)
+
+    def build(self, convert=None, fill=''):
+        '''
+        > Function: builds the dataframe once, replaces all NaN/Null values with 'fill' and applies dtype conversion.
+        > Input: an optional {column name : dtype} dict (columns that were never collected are ignored) and the fill value.
+
+        '''
+        dataframe = pd.DataFrame(self.columns)
+        null_cols = dataframe.columns[dataframe.isna().any()] # Only columns holding nulls need to become 'object'.
+        if len(null_cols):
+            dataframe[null_cols] = dataframe[null_cols].astype(object).where(dataframe[null_cols].notna(), fill)
+        if convert:
+            dataframe = dataframe.astype({k: v for k, v in convert.items() if k in dataframe.columns})
+        return dataframe
@@ -0,0 +1,144 @@
+'''
+Copyright (c) 2022, Volkovx
+All rights reserved.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+This module is an optional on-disk cache (SQLite, under the 'Data' directory) of Nexpose API response bodies, used by
+'NexposeClient'. Each endpoint gets its own time-to-live; once it runs out, the stored ETag / Last-Modified values are
+sent back so the console can answer '304 Not Modified' instead of resending the body. In offline mode every request
+is served from the cache.
+
+__author__ = xVolkov
+__github__ = https://github.com/xVolkov
+__date__ = 10/18/2026
+__version__ = 1.0
+'''
+
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+
+CACHE_PATH = 'Data/http_cache.sqlite' # Change to match your 'Data' directory
+# Time-to-live (seconds) per endpoint, first matching pattern wins. Site configs rarely change between runs:
+TTLS = [
+    (r'/sites/\d+/(included|excluded)_targets$', 24 * 3600),
+    (r'/sites/\d+/(scan_schedules|shared_credentials)$', 6 * 3600),
+    (r'/sites/\d+$', 6 * 3600),
+    (r'/(scan_templates|scan_engines|scan_engine_pools|users)$', 6 * 3600),
+    (r'/administration/info$', 3600),
+]
+DEFAULT_TTL = 0 # Everything else (e.g. the '/sites' listing) is revalidated on every run.
+
+
+class CachedResponse:
+    def __init__(self, body, etag, last_modified, stored_at):
+        '''
+        > Function: class constructor, holds one cached response.
+
+        '''
+        self.body = body # Raw JSON text of the response.
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at # Epoch time the body was stored or last revalidated.
+
+    def json(self):
+        '''
+        > Function: returns the decoded JSON body.
+
+        '''
+        return json.loads(self.body)
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_PATH, ttls=TTLS, default_ttl=DEFAULT_TTL):
+        '''
+        > Function: class constructor, opens (and creates if needed) the SQLite cache file.
+        > Input: cache file path, a list of (URL regex, TTL seconds) and the TTL of endpoints not in that list.
+
+        '''
+        self.path = path
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls]
+        self.default_ttl = default_ttl
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock() # One connection shared by all threads, guarded by this lock.
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, url TEXT, body TEXT, '
+                         'etag TEXT, last_modified TEXT, stored_at REAL)')
+        self._db.commit()
+
+    def key(self, url, params=None):
+        '''
+        > Function: builds the cache key of a request out of its URL and query params.
+
+        '''
+        return f"{url}?{json.dumps(sorted((params or {}).items()))}"
+
+    def ttl(self, url):
+        '''
+        > Function: returns the time-to-live (seconds) of an endpoint.
+
+        '''
+        path = url.split('?')[0]
+        for pattern, ttl in self.ttls:
+            if pattern.search(path):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, url, params=None):
+        '''
+        > Function: returns the cached response of a request, or None if it was never stored.
+
+        '''
+        with self._lock:
+            row = self._db.execute('SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?',
+                                   (self.key(url, params),)).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def is_fresh(self, url, entry):
+        '''
+        > Function: checks whether a cached response is still within its endpoint's time-to-live.
+
+        '''
+        return time.time() - entry.stored_at < self.ttl(url)
+
+    def store(self, url, params, body, etag=None, last_modified=None):
+        '''
+        > Function: stores (or replaces) the response body of a request along with its validators.
+
+        '''
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                             (self.key(url, params), url, body, etag, last_modified, time.time()))
+            self._db.commit()
+
+    def touch(self, url, params=None):
+        '''
+        > Function: restarts the time-to-live of a cached response (the console answered '304 Not Modified').
+
+        '''
+        with self._lock:
+            self._db.execute('UPDATE responses SET stored_at = ? WHERE key = ?', (time.time(), self.key(url, params)))
+            self._db.commit()
+
+    def clear(self):
+        '''
+        > Function: deletes every cached response.
+
+        '''
+        with self._lock:
+            self._db.execute('DELETE FROM responses')
+            self._db.commit()
+
+    def close(self):
+        '''
+        > Function: closes the cache file.
+
+        '''
+        with self._lock:
+            self._db.close()
@@ -5,7 +5,10 @@ This source code is licensed under the BSD-style license found in the
 LICENSE file in the root directory of this source tree. 
 
 This script pulls all Nexpose site included & excluded targets, then proceeds to compare provided IP address (entered by the user) 
-or addresses (using a .txt file) to find the correct site they are under.
+or addresses (using a .txt file) to find the correct site they are under. IPv4 & IPv6 ranges, CIDR blocks and single hosts are
+all supported, in targets as well as in lookups.
+The compiled site targets index is saved to 'Data/site_index.bin' and memory-mapped by later runs (no API calls) until it is
+older than --max-age hours or --rebuild is passed.
 
 __author__ = Volkovx
 __github__ = https://github.com/Volkovx
@@ -15,9 +18,10 @@ __version__ = 1.0
 
 import pandas as pd
 import numpy as np
-import socket, struct
 import csv
 import os
+import sys
+import argparse
 import datetime
 from datetime import datetime, timedelta, date
 from time import strftime
@@ -28,16 +32,22 @@ import urllib3
 import requests
 from timeit import default_timer as timer
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
+from nexpose_client import NexposeClient, POOL_SIZE, TIMEOUT, PAGE_SIZE
+from records import RecordBuilder
+from response_cache import ResponseCache, CACHE_PATH
+from target_index import SiteTargetIndex, INDEX_PATH, MAX_AGE, load_index, write_results
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
 os.getcwd()
 
 class Main:
     def __init__(self, host=None, auth=None, site_IDs=None,
-                 site_targets=[], scan_actuals=[]): 
+                 site_targets=[], scan_actuals=[], pool_size=POOL_SIZE, timeout=TIMEOUT,
+                 page_size=PAGE_SIZE, cache_path=None, offline=False): 
         ''' 
         > Functionality: class constructor.
-        > Input: takes user's Nexpose API credentials and which API host to connect to. 
+        > Input: takes user's Nexpose API credentials, which API host to connect to, HTTP pool size/timeouts/page size,
+                 an optional on-disk response cache file and whether to serve everything from that cache (offline mode). 
 
         '''
         # Nexpose configs:
@@ -45,6 +55,7 @@ class Main:
         self.host = host # Stores selected host URL.
         # DataFrames:
         self.site_targets = site_targets # Stores site targets dataframe.
+        self.index = None # Stores the site targets interval index.
         self.scan_actuals = scan_actuals
         # IDs:
         self.site_IDs = site_IDs # Stores all site IDs.
@@ -69,9 +80,15 @@ class Main:
             user = input("username: ")
             passw = b64e(getpass("password: ").encode())
             self.auth = (user, passw) # Saves user credentials as a Nexpose class attributes (as a tuple).
-            self.test_connection()
         else:
             self.auth = auth
+        if offline and cache_path is None:
+            cache_path = CACHE_PATH
+        cache = ResponseCache(cache_path) if cache_path else None # Optional on-disk response cache.
+        self.client = NexposeClient(self.host, self.auth, pool_size=pool_size, timeout=timeout,
+                                    page_size=page_size, cache=cache, offline=offline) # Shared pooled HTTP client.
+        if auth == None and not offline:
+            self.test_connection()
            
     ### GETS DECODED USER CREDENTIALS ### --> |CALLED: when class object is instantiated.|
     def get_auth(self):
@@ -87,89 +104,55 @@ class Main:
         > Functionality: tests whether user credentials are correct or not by establishing a connection to the API server.
 
         '''
-        url = f"{self.host}/sites"
-        response = requests.get(url, auth=(self.auth[0],b64d(self.auth[1]).decode()), params={'page':0, 'size':1}, verify=False)
+        response = self.client.get("/sites", params={'page':0, 'size':1})
         try:
             response.raise_for_status()
         except:
             print(f'Unable to query API. Request returned error - {response.status_code}: {response.json()["message"]}')
     
-    def IP_rangeSplitter(self, ip_range): # --> |INPUT: a tuple (start, end) of the IP range.|
-        if ' - ' in ip_range: # user provided an IP range
-            IP_range = tuple(ip_range.split(' - '))
-            start = IP_range[0] 
-            end = IP_range[1]
-            start = struct.unpack('>I', socket.inet_aton(start))[0]
-            end = struct.unpack('>I', socket.inet_aton(end))[0]
-            return [socket.inet_ntoa(struct.pack('>I', i)) for i in range(start, end+1)] # Returns all IPs within the range.
-        else: # user didn't provide an IP range
-            return ip_range
-    
     def get_siteIDs(self):
         ''' 
         > Functionality: Gets and stores all Nexpose site IDs.
 
         '''
         print ("\nGetting all site IDs..")
-        host = self.host
-        url = f"{host}/sites" # Nexspose API databse URL (Assigns which part to access of the DB).
-        response = requests.get(url, auth=self.get_auth(), params={'page':0, 'size':500}, verify=False)
-        response.raise_for_status() # Reports back errors/issues.
-        IDs = [x['id'] for x in response.json()['resources']] # Navigating through the output to get site IDs.
+        IDs = [x['id'] for x in self.client.iter_resources("/sites")] # Walks every page of sites to get site IDs.
         self.site_IDs = IDs # Saving as a class attribute 
     
     def get_site_targets(self):
         ''' 
-        > Functionality: Gets and stores API data for sites targets (inclusions & exclusions).
+        > Functionality: Gets and stores API data for sites targets (inclusions & exclusions), then indexes them as
+                         integer IP intervals ('self.index') instead of expanding every range into single IPs.
 
         '''
         print('Getting site targets data..')
-        sites_df = pd.DataFrame()
+        records = RecordBuilder()
+        index = SiteTargetIndex()
         
         for s_ID in self.site_IDs: # Gets inc/exc targets for all sites (interpreting site-by-site).
-            incTargets = []
-            excTargets = []
-            included_assets = requests.get(self.host + f"/sites/{s_ID}/included_targets",
-                                           auth=self.get_auth(), params={'size': 500}, verify=False) # Inc targets API call.
-            excluded_assets = requests.get(self.host + f"/sites/{s_ID}/excluded_targets",
-                                           auth=self.get_auth(), params={'size': 500}, verify=False) # Exc targets API call.
-            site_name = requests.get(self.host + f"/sites/{s_ID}",
-                                           auth=self.get_auth(), params={'size': 500}, verify=False) # Gets site name
-            # Creates a dictionary that stores data sorted by site ID:
+            included_assets = self.client.get_json(f"/sites/{s_ID}/included_targets") # Inc targets API call.
+            excluded_assets = self.client.get_json(f"/sites/{s_ID}/excluded_targets") # Exc targets API call.
+            site = self.client.get_json(f"/sites/{s_ID}") # Gets site name (memoized site document)
+            # Creates a dictionary that stores data sorted by site ID (targets are kept as returned by the API):
             data = {'Site ID': round(s_ID),
-                    'Site Name':None,
-                    'Included Targets':None,
-                    'Excluded Targets':None,}
-            data['Site Name'] = site_name.json()['name']
-            try:
-                out_data = included_assets.json()['addresses']
-                for item in out_data:
-                    incTargets.append((self.IP_rangeSplitter(item)))
-                data['Included Targets'] = incTargets
-            except:
-                pass
-            
-            try:
-                out_data = excluded_assets.json()['addresses']
-                for item in out_data:
-                    excTargets.append((self.IP_rangeSplitter(item)))
-                data['Excluded Targets'] = excTargets
-            except:
-                pass
-            sites_df = sites_df.append(data, ignore_index = True)
-            sites_df = sites_df.replace(np.nan,'',regex=True) # Replaces all NaN/Null values with an empty string.
-            sites_df.sort_values(by=['Site ID'])
+                    'Site Name':site['name'],
+                    'Included Targets':included_assets.get('addresses', []),
+                    'Excluded Targets':excluded_assets.get('addresses', [])}
+            index.add_site(data['Site ID'], data['Site Name'], data['Included Targets'], data['Excluded Targets'])
+            records.append(data) # Collecting data in column buffers
         convert = {'Site ID': int}
-        sites_df = sites_df.astype(convert)
+        sites_df = records.build(convert) # Builds the dataframe once, replacing all NaN/Null values with an empty string.
         sites_df.sort_values(by=['Site ID'])
         self.site_targets = sites_df # Saving as a class attribute.
+        index.build() # Subtracts exclusions and builds the lookup segments
+        self.index = index # Saving as a class attribute.
     
-    def flatten(self, List):
-        flat = []
-        for item in List:
-            for sub in item:
-                flat.append(sub)
-        return flat
+    def find_sites(self, IP):
+        ''' 
+        > Functionality: Returns the names of every site whose targets (inclusions minus exclusions) contain an IP.
+
+        '''
+        return [name for _, name in self.index.lookup(IP)]
     
     def loader(self):
         start = timer()
@@ -180,8 +163,36 @@ class Main:
 
 ###################################################################### Script Runner ##################################################################################
 
-main = Main() # Creates an object of the 'Main' class
-main.loader() # Loads Main class's methods
+parser = argparse.ArgumentParser(description="Finds which Nexpose site(s) an IP address belongs to.")
+parser.add_argument('--cache', action='store_true', help=f'keep API responses in an on-disk cache ({CACHE_PATH})')
+parser.add_argument('--offline', action='store_true', help='serve every API call from the on-disk cache only')
+parser.add_argument('--rebuild', action='store_true', help=f'rebuild the saved site targets index ({INDEX_PATH}) from the API')
+parser.add_argument('--max-age', type=float, default=MAX_AGE / 3600, help=f'hours before the saved index is rebuilt (default: {MAX_AGE // 3600})')
+parser.add_argument('--report', action='store_true', help="save each site's effective scope & the address blocks claimed by several sites, then exit")
+parser.add_argument('--output-format', choices=['csv', 'jsonl'], default='csv', help='output file format of list mode & reports (default: csv)')
+args = parser.parse_args()
+
+index = None if args.rebuild else load_index(INDEX_PATH, args.max_age * 3600) # Maps the saved index if it's fresh
+if index is None: # No saved index (or it's stale / a rebuild was requested), builds it from the API
+    main = Main(cache_path=CACHE_PATH if args.cache else None, offline=args.offline) # Creates an object of the 'Main' class
+    main.loader() # Loads Main class's methods
+    index = main.index
+    index.save(INDEX_PATH) # Saves the index for the next runs
+    print(f"Site targets index saved to '{INDEX_PATH}'")
+else:
+    print(f"Using the site targets index saved on {datetime.fromtimestamp(index.built_at).strftime('%m-%d-%Y %H:%M:%S')} "
+          f"('{INDEX_PATH}'), run with --rebuild to refresh it from the API.")
+
+if args.report: # Saves the effective scope & overlap reports instead of looking up IPs
+    date_str = datetime.now().strftime("%m-%d-%Y_T%H-%M-%S") # Creating date-time string
+    scopes, overlaps = index.scope_report(), index.overlap_report()
+    for name, report in (('Site_Scopes', scopes), ('Site_Overlaps', overlaps)):
+        write_results(report, os.path.join('Output', f'{name}({date_str}).{args.output_format}'), args.output_format)
+    print(f"\n{len(scopes)} site(s) cover {int(scopes['Effective Addresses'].sum())} address(es) in total, "
+          f"{len(overlaps)} address block(s) ({int(overlaps['Addresses'].sum())} addresses) are claimed by more than one site.")
+    print(overlaps.head(20).to_string(index=False)) # Prints the first overlapping blocks
+    print(f"\nReports saved to 'Output/Site_Scopes({date_str}).{args.output_format}' and 'Output/Site_Overlaps({date_str}).{args.output_format}'")
+    sys.exit()
 
 IP = 1
 IPs_path = 1
@@ -206,76 +217,29 @@ if IPs_path == None: # User chose to look-up one IP address
     start = timer() # To time how long the code takes to run
     now = datetime.now() # Getting today's date & time
     date_str = now.strftime("%m-%d-%Y_T%H-%M-%S") # Creating date-time string
-    IP = IP
-    info = main.site_targets.copy() # Making a copy of the site targets api call dataframe
-    info = info[['Site Name', 'Included Targets', 'Excluded Targets']] # Filtering the dataframe for needed columns
-
-    inc_data = {  
-        'Inc':None,
-        'Site':None
-    }
-    exc_data = {
-        'Exc':None,
-        'Site':None
-    }
-    output = {}
-    inc_list = []
-    exc_list = []
+    IP = IP.strip()
+    output = {IP: [name for _, name in index.lookup(IP)]} # One binary search over the site targets index
 
-    for inc, exc, site in zip(info['Included Targets'], info['Excluded Targets'], info['Site Name']):
-        inc_data['Inc'] = main.flatten(inc)
-        inc_data['Site'] = site
-        exc_data['Exc'] = main.flatten(exc)
-        exc_data['Site'] = site
-        if IP in inc_data['Inc']:
-            if IP not in exc_data['Exc']:
-                output[IP] = inc_data['Site']
-
-        
-        with open(f'Output\\Site_Finder({date_str}).txt', 'a') as output_f: # Creating file handler for the .txt output file
-            output_f.write(f"{str(output)}\n") # Writing output to the .txt file (line by line)
+    with open(os.path.join('Output', f'Site_Finder({date_str}).txt'), 'a') as output_f: # Creating file handler for the .txt output file
+        output_f.write(f"{str(output)}\n") # Writing output to the .txt file
             
-    print(f'\nThe result is: {output}') # Prints the IP and its associated Site's name
+    print(f'\nThe result is: {output}') # Prints the IP and its associated Sites' names
     end = timer() # To time how long the code takes to run
     print(f"\nCode execution complete, time elapsed: {round((end-start)/60)} minute(s)")
 
 if IP == None: # User chose to look-up several IP addresses
     start = timer() # To time how long the code takes to run
-    print("\n------------------------------------------\nResults:\n")
     now = datetime.now() # Getting today's date & time
     date_str = now.strftime("%m-%d-%Y_T%H-%M-%S") # Creating date-time string
-    IPs = open(f'{IPs_path}', 'r') # Reading the IP addresses in the user provided file
-    contents = IPs.read()
-    lines = contents.split('\n') # Converting the txt file contents to a Python list
-    for line in lines: # Reading each IP in the provided IP list
-        IP = line
-        info = main.site_targets.copy() # Making a copy of the site targets api call dataframe
-        info = info[['Site Name', 'Included Targets', 'Excluded Targets']] # Filtering the dataframe for needed columns
-
-        inc_data = {  
-            'Inc':None,
-            'Site':None
-        }
-        exc_data = {
-            'Exc':None,
-            'Site':None
-        }
-        output = {}
-        inc_list = []
-        exc_list = []
-
-        for inc, exc, site in zip(info['Included Targets'], info['Excluded Targets'], info['Site Name']):
-            inc_data['Inc'] = main.flatten(inc)
-            inc_data['Site'] = site
-            exc_data['Exc'] = main.flatten(exc)
-            exc_data['Site'] = site
-            if IP in inc_data['Inc']:
-                if IP not in exc_data['Exc']:
-                    output[IP] = inc_data['Site']
-
-        print(output) # Prints the IP and its associated Site's name
-        with open(f'Output\\Site_Finder({date_str}).txt', 'a') as output_f: # Creating file handler for the .txt output file
-            output_f.write(f"{str(output)}\n") # Writing output to the .txt file (line by line)
+    with open(f'{IPs_path}', 'r') as IPs: # Reading the IP addresses in the user provided file
+        lines = [line.strip() for line in IPs.read().split('\n') if line.strip()] # Converting the txt file contents to a Python list
+    results = index.resolve_many(lines) # Resolves the whole list in one vectorized pass
+    output_path = os.path.join('Output', f'Site_Finder({date_str}).{args.output_format}')
+    write_results(results, output_path, args.output_format) # Writing all results to a single output file
 
+    matched = results['Site IDs'].map(len) > 0
+    print("\n------------------------------------------\nResults:\n")
+    print(results.head(20).to_string(index=False)) # Prints the first IPs and their associated Sites' names
+    print(f"\n{int(matched.sum())} of {len(results)} IP address(es) matched at least one site, results saved to '{output_path}'")
     end = timer() # To time how long the code takes to run
     print(f"\nCode execution complete, time elapsed: {round((end-start)/60)} minute(s)")
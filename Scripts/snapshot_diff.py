@@ -0,0 +1,166 @@
+'''
+Copyright (c) 2022, Volkovx
+All rights reserved.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+This script compares two dated Nexpose data snapshots (saved by 'api_calls.py' under 'Data/<date>/') dataset by
+dataset. Rows are matched on their stable IDs (Site ID, Scan Schedule ID, Credential ID, Scan Engine ID, etc.) and
+reported as added, removed or changed field by field. Every row is hashed once so unchanged rows are skipped in a
+single vectorized pass; only rows whose hash differs are compared column by column. The diff can also be saved as
+JSON (same 'added'/'removed'/'changed' layout as csv-diff's JSON output).
+
+Usage: python snapshot_diff.py [OLD_DATE NEW_DATE] [--json diff.json]
+       (with no dates, the two newest snapshots are compared)
+
+__author__ = xVolkov
+__github__ = https://github.com/xVolkov
+__date__ = 10/18/2026
+__version__ = 1.0
+'''
+
+import os
+import sys
+import json
+import argparse
+import numpy as np
+import pandas as pd
+from snapshots import DATA_DIR, DATASETS, list_snapshots, load_snapshot
+
+# Stores {dataset name : columns identifying a row}:
+KEYS = {'siteCreds': ['Site ID', 'Credential ID'],
+        'siteInfo': ['Site ID'],
+        'scanSchedules': ['Site ID', 'Scan Schedule ID'],
+        'scanEngines': ['Scan Engine ID'],
+        'enginePools': ['Pool ID'],
+        'scanTemplates': ['Scan Template ID'],
+        'users': ['User ID'],
+        'console': ['Product ID']}
+
+
+def to_json_value(value):
+    '''
+        > Function: converts a dataframe cell to a plain JSON-friendly Python value.
+    '''
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [to_json_value(v) for v in value]
+    if value is None or value is pd.NA or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def hashable(dataframe):
+    '''
+        > Function: returns a copy of a dataframe whose list cells are tuples, so rows can be hashed and compared.
+    '''
+    dataframe = dataframe.copy()
+    for column in dataframe.columns:
+        if dataframe[column].dtype == object:
+            dataframe[column] = [tuple(v) if isinstance(v, (list, np.ndarray)) else v for v in dataframe[column]]
+    return dataframe
+
+
+def diff_dataset(old, new, keys):
+    '''
+        > Function: diffs one dataset between two snapshots.
+        > Input: old and new dataframes and the key columns identifying a row.
+        > Output: a dict with 'added'/'removed' rows, 'changed' rows ({'key', 'changes': {column: [old, new]}})
+                  and any columns added/removed between the two snapshots.
+    '''
+    columns = [c for c in new.columns if c in old.columns and c not in keys] # Columns compared field by field.
+    old = hashable(old).drop_duplicates(subset=keys, keep='last').set_index(keys)
+    new = hashable(new).drop_duplicates(subset=keys, keep='last').set_index(keys)
+    # One hash per row over the shared columns, compared in one vectorized pass:
+    old_hash = pd.util.hash_pandas_object(old[columns], index=False)
+    new_hash = pd.util.hash_pandas_object(new[columns], index=False)
+    common = old.index.intersection(new.index)
+    changed_keys = common[old_hash.loc[common].to_numpy() != new_hash.loc[common].to_numpy()]
+
+    def rows(frame, index):
+        return [{k: to_json_value(v) for k, v in row.items()} for row in frame.loc[index].reset_index().to_dict('records')]
+
+    changed = []
+    before_rows = old.loc[changed_keys, columns].to_dict('records') # Only rows whose hash differs are
+    after_rows = new.loc[changed_keys, columns].to_dict('records')  # compared column by column.
+    for key, before, after in zip(changed_keys, before_rows, after_rows):
+        changes = {c: [to_json_value(before[c]), to_json_value(after[c])] for c in columns
+                   if to_json_value(before[c]) != to_json_value(after[c])}
+        if changes: # Guards against hash collisions between equal rows of different dtypes.
+            key = key if isinstance(key, tuple) else (key,)
+            changed.append({'key': {k: to_json_value(v) for k, v in zip(keys, key)}, 'changes': changes})
+    return {'key_columns': keys,
+            'added': rows(new, new.index.difference(old.index)),
+            'removed': rows(old, old.index.difference(new.index)),
+            'changed': changed,
+            'columns_added': [c for c in new.columns if c not in old.columns],
+            'columns_removed': [c for c in old.columns if c not in new.columns]}
+
+
+def diff_snapshots(old_path, new_path):
+    '''
+        > Function: diffs every dataset found in both snapshots, returns {dataset name : dataset diff}.
+    '''
+    old, new = load_snapshot(old_path), load_snapshot(new_path)
+    result = {}
+    for name, keys in KEYS.items():
+        if name not in old or name not in new:
+            print(f'{DATASETS[name]} is missing from one of the snapshots, skipping it..')
+            continue
+        if not all(k in old[name].columns and k in new[name].columns for k in keys):
+            print(f'{DATASETS[name]} lacks its key column(s) {keys}, skipping it..')
+            continue
+        result[name] = diff_dataset(old[name], new[name], keys)
+    return result
+
+
+def snapshot_path(value, data_dir=DATA_DIR):
+    '''
+        > Function: resolves a snapshot given as a date ('2022-08-14') or a directory path.
+    '''
+    return value if os.path.isdir(value) else os.path.join(data_dir, value)
+
+
+###################################################################### Script Runner ##################################################################################
+
+parser = argparse.ArgumentParser(description='Compares two dated Nexpose data snapshots.')
+parser.add_argument('old', nargs='?', help='older snapshot date (YYYY-MM-DD) or directory')
+parser.add_argument('new', nargs='?', help='newer snapshot date (YYYY-MM-DD) or directory')
+parser.add_argument('--data-dir', default=DATA_DIR, help=f'snapshots directory (default: {DATA_DIR})')
+parser.add_argument('--json', help='also save the diff as JSON to this file')
+args = parser.parse_args()
+
+if args.old and args.new:
+    old_path, new_path = snapshot_path(args.old, args.data_dir), snapshot_path(args.new, args.data_dir)
+elif not args.old and not args.new:
+    snapshots = list_snapshots(args.data_dir)
+    if len(snapshots) < 2:
+        print(f"Need at least two snapshots under '{args.data_dir}' to compare. Exiting program..")
+        sys.exit()
+    old_path, new_path = snapshots[-2], snapshots[-1]
+else:
+    print('Please provide both snapshot dates, or none to compare the two newest snapshots.')
+    sys.exit()
+
+for path in (old_path, new_path):
+    if not os.path.isdir(path):
+        print(f"\nInvalid input! Snapshot '{path}' does not exist!")
+        sys.exit()
+
+print(f"Comparing '{old_path}' -> '{new_path}'..\n")
+diff = diff_snapshots(old_path, new_path)
+for name, result in diff.items():
+    print(f"{DATASETS[name]}: {len(result['added'])} added, {len(result['removed'])} removed, "
+          f"{len(result['changed'])} changed")
+    for row in result['changed'][:20]: # Prints the first changes of each dataset
+        changes = ', '.join(f"{c}: {old} -> {new}" for c, (old, new) in row['changes'].items())
+        print(f"  ~ {row['key']}: {changes}")
+    if len(result['changed']) > 20:
+        print(f"  ... {len(result['changed']) - 20} more changed row(s)")
+
+if args.json:
+    with open(args.json, 'w') as f:
+        json.dump(diff, f, indent=2, default=str)
+    print(f"\nDiff saved to '{args.json}'")
@@ -0,0 +1,251 @@
+'''
+Copyright (c) 2022, Volkovx
+All rights reserved.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+This module reads and writes the dated Nexpose data snapshots saved by 'api_calls.py' under 'Data/<date>/'. Each
+snapshot holds one file per dataset plus 'Site_Summaries.json', a hash of every site's '/sites' listing entry that
+incremental runs compare against to find new or modified sites, and 'Site_Fetched.json', the date each site's
+schedules & credentials were last actually fetched (rows carried forward keep their original date).
+
+Datasets are written as compressed Parquet files (needs pyarrow) with an explicit schema per dataset: IDs stay
+integers, flags stay booleans, and targets, engine sites and pool engines are stored as list columns. CSV export is
+still available. 'load_snapshot' reads either format back with the same types.
+
+__author__ = xVolkov
+__github__ = https://github.com/xVolkov
+__date__ = 10/18/2026
+__version__ = 1.0
+'''
+
+import os
+import re
+import ast
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # Parquet snapshots need pyarrow, CSV snapshots don't.
+    pa = None
+
+DATA_DIR = 'Data' # Change to match your 'Data' directory
+SUMMARIES_FILE = 'Site_Summaries.json'
+FETCHED_FILE = 'Site_Fetched.json'
+FORMATS = ('parquet', 'csv') # Supported snapshot file formats.
+COMPRESSION = 'zstd' # Parquet compression codec.
+# Stores {dataset name : file name (without extension)} for every dataset of a snapshot:
+DATASETS = {'siteCreds': 'Site_Credentials_Configs',
+            'siteInfo': 'Site_Defaults',
+            'scanSchedules': 'Scan_Schedules_Configs',
+            'scanEngines': 'Scan_Engines_Configs',
+            'enginePools': 'Engine_Pools_Configs',
+            'scanTemplates': 'Scan_Templates_Configs',
+            'users': 'Users',
+            'console': 'Console_Info'}
+# Stores {dataset name : [(column, type)]}, types are 'int', 'bool', 'str', 'list[str]' or 'list[int]'.
+# Columns not listed here are stored as strings.
+SCHEMAS = {'siteCreds': [('Site ID', 'int'), ('Site Name', 'str'), ('Site Credential Enabled?', 'bool'),
+                         ('Credential Name', 'str'), ('Credential ID', 'int'), ('Credential Service', 'str')],
+           'siteInfo': [('Site ID', 'int'), ('Number of Assets', 'int'), ('Site Name', 'str'),
+                        ('Default Scan Engine', 'int'), ('Default Template', 'str'), ('Site Type', 'str')],
+           'scanSchedules': [('Site ID', 'int'), ('Enabled', 'bool'), ('Scan Schedule ID', 'int'), ('Scan Name', 'str'),
+                             ('Scan Template ID', 'str'), ('Scan Engine ID', 'int'), ('Included Assets', 'list[str]'),
+                             ('Excluded Assets', 'list[str]'), ('Start Time', 'str')],
+           'scanEngines': [('Scan Engine ID', 'int'), ('Scan Engine Name', 'str'), ('Sites', 'list[int]'),
+                           ('Address', 'str'), ('Port', 'int'), ('Content Version', 'str'), ('Product Version', 'str')],
+           'enginePools': [('Pool ID', 'int'), ('Pool Name', 'str'), ('Pool Engines', 'list[int]')],
+           'scanTemplates': [('Scan Template Name', 'str'), ('Scan Template ID', 'str'), ('Description', 'str'),
+                             ('Discovery Only?', 'bool'), ('Vulnerability Enabled?', 'bool'), ('Policy Enabled?', 'bool'),
+                             ('Policy', 'str'), ('Web Enabled?', 'bool'), ('Web', 'str'),
+                             ('Windows Services Enabled?', 'bool'), ('Enhanced Logging?', 'bool'),
+                             ('Max Parallel Assets', 'int'), ('Max Scan Processes', 'int'), ('Telnet', 'str')],
+           'users': [('User Name', 'str'), ('User ID', 'int')],
+           'console': [('Content Version', 'str'), ('Content Version (Partial)', 'str'), ('Product ID', 'str'),
+                       ('Version ID', 'str'), ('Product', 'str')]}
+# '/sites' listing fields that change with every scan rather than with the site's configuration:
+VOLATILE_SITE_FIELDS = ('assets', 'lastScanTime', 'riskScore', 'vulnerabilities', 'links')
+
+
+def site_summary(site):
+    '''
+        > Function: hashes a site's '/sites' listing entry, ignoring fields that change with every scan.
+    '''
+    stable = {k: v for k, v in site.items() if k not in VOLATILE_SITE_FIELDS}
+    return hashlib.sha1(json.dumps(stable, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def list_snapshots(data_dir=DATA_DIR):
+    '''
+        > Function: returns the paths of all dated snapshot directories, oldest first.
+    '''
+    if not os.path.isdir(data_dir):
+        return []
+    days = sorted(d for d in os.listdir(data_dir) if re.fullmatch(r'\d{4}-\d{2}-\d{2}', d))
+    return [os.path.join(data_dir, d) for d in days if os.path.isdir(os.path.join(data_dir, d))]
+
+
+def latest_snapshot(data_dir=DATA_DIR, require_summaries=False):
+    '''
+        > Function: returns the path of the newest snapshot (optionally only ones saved with site summaries), or None.
+    '''
+    for path in reversed(list_snapshots(data_dir)):
+        if not require_summaries or os.path.isfile(os.path.join(path, SUMMARIES_FILE)):
+            return path
+    return None
+
+
+def _is_missing(value):
+    '''
+        > Function: checks whether a cell holds no value ('' and NaN/None are both used for missing data).
+    '''
+    if value is None or value is pd.NA or (isinstance(value, str) and value == ''):
+        return True
+    return isinstance(value, float) and np.isnan(value)
+
+
+def _coerce(value, kind):
+    '''
+        > Function: converts one cell to its schema type. Also parses the text written by older CSV snapshots
+                    (e.g. "{'10.0.0.1'}" for a set of targets, 'True' for a flag).
+    '''
+    if _is_missing(value):
+        return None
+    if kind.startswith('list'):
+        if isinstance(value, str):
+            value = ast.literal_eval(value)
+        item = int if kind == 'list[int]' else str
+        values = [item(v) for v in value]
+        return sorted(values) if isinstance(value, (set, frozenset)) else values
+    if kind == 'int':
+        return int(float(value)) if isinstance(value, str) else int(value)
+    if kind == 'bool':
+        return value.strip().lower() == 'true' if isinstance(value, str) else bool(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True) # Nested API objects (e.g. template 'Policy') are kept as JSON text.
+    return str(value)
+
+
+def _arrow_type(kind):
+    '''
+        > Function: maps a schema type to its pyarrow type.
+    '''
+    return {'int': pa.int64(), 'bool': pa.bool_(), 'str': pa.string(),
+            'list[str]': pa.list_(pa.string()), 'list[int]': pa.list_(pa.int64())}[kind]
+
+
+def column_types(name, dataframe):
+    '''
+        > Function: returns the [(column, type)] list of a dataset (schema columns first, then any extra columns as strings).
+    '''
+    schema = SCHEMAS[name]
+    known = {column for column, _ in schema}
+    return schema + [(column, 'str') for column in dataframe.columns if column not in known]
+
+
+def to_arrow(name, dataframe):
+    '''
+        > Function: converts a dataset to a pyarrow table with the dataset's explicit schema.
+                    Schema columns missing from the dataframe are stored as all-null columns.
+    '''
+    arrays, fields = [], []
+    for column, kind in column_types(name, dataframe):
+        values = dataframe[column].tolist() if column in dataframe.columns else [None] * len(dataframe)
+        arrays.append(pa.array([_coerce(v, kind) for v in values], type=_arrow_type(kind)))
+        fields.append(pa.field(column, _arrow_type(kind)))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def from_arrow(table):
+    '''
+        > Function: converts a pyarrow table back to a dataframe, using nullable pandas dtypes for ints and bools
+                    and plain Python lists for list columns.
+    '''
+    dataframe = table.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype(), pa.bool_(): pd.BooleanDtype()}.get)
+    for field in table.schema:
+        if pa.types.is_list(field.type):
+            dataframe[field.name] = [None if v is None else v.tolist() for v in dataframe[field.name]]
+    return dataframe
+
+
+def write_snapshot(path, datasets, summaries=None, formats=('parquet',), fetched=None):
+    '''
+        > Function: writes a snapshot directory.
+        > Input: snapshot path, a {dataset name : dataframe} dict (None dataframes are skipped), the
+                 optional {site ID : summary hash} dict, the file formats to write ('parquet' and/or 'csv') and the
+                 optional {site ID : date its site data was last fetched ('YYYY-MM-DD')} dict.
+    '''
+    if 'parquet' in formats and pa is None:
+        print('pyarrow is not installed, saving the snapshot as CSV instead..')
+        formats = ('csv',)
+    os.makedirs(path, exist_ok=True)
+    for name, dataframe in datasets.items():
+        if dataframe is None:
+            print(f'No data collected for {DATASETS[name]}, skipping it..')
+            continue
+        if 'parquet' in formats:
+            pq.write_table(to_arrow(name, dataframe), os.path.join(path, f"{DATASETS[name]}.parquet"),
+                           compression=COMPRESSION)
+        if 'csv' in formats:
+            dataframe.to_csv(os.path.join(path, f"{DATASETS[name]}.csv"), index = False, header = True)
+    if summaries is not None:
+        with open(os.path.join(path, SUMMARIES_FILE), 'w') as f:
+            json.dump({str(k): v for k, v in summaries.items()}, f)
+    if fetched is not None:
+        with open(os.path.join(path, FETCHED_FILE), 'w') as f:
+            json.dump({str(k): v for k, v in fetched.items()}, f)
+
+
+def load_dataset(path, name):
+    '''
+        > Function: reads one dataset of a snapshot with its schema types (Parquet preferred over CSV), or None if missing.
+    '''
+    parquet_path = os.path.join(path, f"{DATASETS[name]}.parquet")
+    csv_path = os.path.join(path, f"{DATASETS[name]}.csv")
+    if pa is not None and os.path.isfile(parquet_path):
+        return from_arrow(pq.read_table(parquet_path))
+    if os.path.isfile(csv_path):
+        dataframe = pd.read_csv(csv_path, dtype=str, keep_default_na=False) # Raw text, typed below.
+        if pa is None:
+            return dataframe
+        return from_arrow(to_arrow(name, dataframe)) # Same types as a Parquet snapshot.
+    return None
+
+
+def load_snapshot(path):
+    '''
+        > Function: reads a snapshot back as a {dataset name : dataframe} dict (datasets missing on disk are left out).
+    '''
+    datasets = {}
+    for name in DATASETS:
+        dataframe = load_dataset(path, name)
+        if dataframe is not None:
+            datasets[name] = dataframe
+    return datasets
+
+
+def load_summaries(path):
+    '''
+        > Function: reads a snapshot's {site ID : summary hash} dict (empty if it was saved without one).
+    '''
+    file_path = os.path.join(path, SUMMARIES_FILE)
+    if not os.path.isfile(file_path):
+        return {}
+    with open(file_path) as f:
+        return {int(k): v for k, v in json.load(f).items()}
+
+
+def load_fetched(path):
+    '''
+        > Function: reads a snapshot's {site ID : date its site data was last fetched} dict. Snapshots saved without
+                    one count every site as fetched on the snapshot's own date.
+    '''
+    file_path = os.path.join(path, FETCHED_FILE)
+    if not os.path.isfile(file_path):
+        return {s_ID: os.path.basename(os.path.normpath(path)) for s_ID in load_summaries(path)}
+    with open(file_path) as f:
+        return {int(k): v for k, v in json.load(f).items()}
@@ -0,0 +1,265 @@
+'''
+Copyright (c) 2022, Volkovx
+All rights reserved.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+This module is the bulk tag/untag engine used by 'asset_tagger.py'. Asset IDs are streamed from the input file and
+the '/assets/{id}/tags/{tag_id}' PUT/DELETE calls run on a bounded thread pool over the client's pooled keep-alive
+session, with only a bounded number of requests queued at a time. Every call's outcome is recorded as one row
+(asset ID, tag ID, action, status, HTTP status, error), so a run ends with a summary and a CSV log instead of one
+printed response per asset.
+
+__author__ = xVolkov
+__github__ = https://github.com/xVolkov
+__date__ = 10/18/2026
+__version__ = 1.0
+'''
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import pandas as pd
+import requests
+from nexpose_client import CONCURRENCY
+
+ACTIONS = ('tag', 'untag') # 'tag' sends PUT, 'untag' sends DELETE.
+SYNC_MODES = ('add', 'remove', 'exact') # How a tag's membership is reconciled with the listed assets.
+QUEUE_PER_WORKER = 4 # Requests queued per worker, bounds memory when streaming large ID files.
+CATALOG_TTL = 15 * 60 # Seconds the tag catalog is trusted before it's fetched again.
+COLUMNS = ['Asset ID', 'Tag ID', 'Action', 'Status', 'HTTP Status', 'Error', 'Seconds'] # Outcome row layout.
+
+
+def tag_key(name):
+    '''
+        > Function: normalizes a tag name for look-ups (surrounding spaces and case are ignored).
+    '''
+    return str(name).strip().casefold()
+
+
+class TagCatalog:
+    def __init__(self, client, ttl=CATALOG_TTL):
+        '''
+        > Function: class constructor. The catalog holds every Nexpose tag indexed by ID and by normalized name, it's
+                    fetched once (all pages) on first use and only fetched again after 'ttl' seconds or when a
+                    look-up misses (e.g. a tag created since the last fetch).
+        > Input: the shared NexposeClient and the catalog's time-to-live in seconds.
+
+        '''
+        self.client = client
+        self.ttl = ttl
+        self.by_id = {} # Stores {tag ID : tag}
+        self.by_name = {} # Stores {normalized tag name : tag}
+        self.loaded_at = None # Time of the last fetch.
+        self.fetches = 0 # Number of catalog fetches this session.
+        self._lock = threading.Lock() # Batch jobs may resolve tags from several threads.
+
+    def refresh(self):
+        '''
+        > Function: fetches every tag again (bypassing memoized responses) and rebuilds both indexes.
+
+        '''
+        self.client.clear_cache()
+        tags = list(self.client.iter_resources("/tags")) # Walks every page of tags.
+        by_name = {}
+        for tag in tags:
+            by_name.setdefault(tag_key(tag['name']), tag) # Keeps the first tag of duplicate names.
+        self.by_id, self.by_name = {tag['id']: tag for tag in tags}, by_name
+        self.loaded_at = time.time()
+        self.fetches += 1
+
+    def is_stale(self):
+        '''
+        > Function: checks whether the catalog was never fetched or is older than its TTL.
+
+        '''
+        return self.loaded_at is None or time.time() - self.loaded_at > self.ttl
+
+    def _get(self, value, lookup):
+        if lookup == 'id':
+            return self.by_id.get(int(value))
+        return self.by_name.get(tag_key(value))
+
+    def find(self, value, lookup='name'):
+        '''
+        > Function: finds a tag by its ID (lookup 'id') or its name (lookup 'name', case-insensitive).
+        > Output: the tag (dict from '/tags') or None if it doesn't exist even after a refresh.
+
+        '''
+        if lookup == 'id' and not str(value).strip().isdigit():
+            return None # Not a tag ID, no fetch can find it.
+        with self._lock:
+            refreshed = self.is_stale()
+            if refreshed:
+                self.refresh()
+            tag = self._get(value, lookup)
+            if tag is None and not refreshed: # Missing tags may be new, fetches the catalog once more.
+                self.refresh()
+                tag = self._get(value, lookup)
+            return tag
+
+    def tags(self):
+        '''
+        > Function: returns every tag in the catalog (fetched first if stale).
+
+        '''
+        with self._lock:
+            if self.is_stale():
+                self.refresh()
+            return list(self.by_id.values())
+
+
+def read_asset_ids(path):
+    '''
+        > Function: generator that streams asset IDs from a .txt file (one per line, blank lines skipped).
+    '''
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield line.strip()
+
+
+def plan_sync(current, asset_ids, mode='add'):
+    '''
+        > Function: computes the tag/untag calls needed to bring a tag's membership to the desired state, skipping
+                    assets already in that state.
+        > Input: the tag's current members ({asset ID : sources} from '/tags/{id}/assets'), the listed asset IDs and
+                 the mode: 'add' tags listed assets missing the tag, 'remove' untags listed assets carrying it and
+                 'exact' does both so the tag ends up on exactly the listed assets.
+        > Output: {'tag': [IDs], 'untag': [IDs], 'unchanged': count, 'criteria': [IDs], 'invalid': [entries]}
+                  ('criteria' are assets to untag that only carry the tag through its search criteria, which a
+                  DELETE cannot remove).
+    '''
+    if mode not in SYNC_MODES:
+        raise Exception(f"Unknown sync mode '{mode}', expected one of {SYNC_MODES}")
+    listed, invalid = set(), []
+    for asset_id in asset_ids:
+        if str(asset_id).isdigit():
+            listed.add(int(asset_id))
+        else:
+            invalid.append(asset_id)
+    members = set(current)
+    to_tag = listed - members if mode != 'remove' else set()
+    to_untag = (listed & members if mode == 'remove' else members - listed) if mode != 'add' else set()
+    criteria = {a for a in to_untag if 'tag' not in current[a]} # Not removable through the API.
+    to_untag -= criteria
+    unchanged = len(listed) - len(to_tag) - len(to_untag & listed) - len(criteria & listed)
+    return {'tag': sorted(to_tag), 'untag': sorted(to_untag), 'unchanged': unchanged, 'criteria': sorted(criteria),
+            'invalid': invalid}
+
+
+def print_plan(tag_id, plan):
+    '''
+        > Function: prints a sync plan's summary (assets to tag/untag, skipped assets & the number of requests).
+    '''
+    print(f"\nSync plan for tag {tag_id}: {len(plan['tag'])} asset(s) to tag, {len(plan['untag'])} to untag, "
+          f"{plan['unchanged']} listed asset(s) already in the desired state.")
+    if plan['criteria']:
+        print(f"  {len(plan['criteria'])} asset(s) carry the tag through its search criteria only and can't be untagged "
+              f"(e.g. {', '.join(map(str, plan['criteria'][:10]))})")
+    if plan['invalid']:
+        print(f"  {len(plan['invalid'])} invalid asset ID(s) skipped (e.g. {', '.join(plan['invalid'][:10])})")
+    print(f"  Requests needed: {len(plan['tag']) + len(plan['untag'])}")
+
+
+def error_message(response):
+    '''
+        > Function: returns the error message of a failed API response (the JSON 'message' field when there is one).
+    '''
+    try:
+        return response.json().get('message', response.reason)
+    except ValueError:
+        return response.reason
+
+
+class TagEngine:
+    def __init__(self, client, workers=CONCURRENCY):
+        '''
+        > Function: class constructor.
+        > Input: the shared NexposeClient and the max number of concurrent requests (at most the client's pool size
+                 is useful, extra workers would wait for a pooled connection).
+
+        '''
+        self.client = client
+        self.workers = max(1, workers)
+
+    def apply(self, action, tag_id, asset_id):
+        '''
+        > Function: adds (action 'tag') or removes (action 'untag') one tag on one asset.
+        > Output: the outcome row (dict with the 'COLUMNS' keys).
+
+        '''
+        start = time.time()
+        outcome = {'Asset ID': asset_id, 'Tag ID': tag_id, 'Action': action, 'Status': 'failed', 'HTTP Status': None,
+                   'Error': ''}
+        if not str(asset_id).isdigit():
+            outcome['Error'] = 'Invalid asset ID'
+        else:
+            method = self.client.put if action == 'tag' else self.client.delete
+            try:
+                response = method(f"/assets/{asset_id}/tags/{tag_id}")
+                outcome['HTTP Status'] = response.status_code
+                if response.ok:
+                    outcome['Status'] = 'done'
+                else:
+                    outcome['Error'] = error_message(response)
+            except requests.RequestException as e: # Network errors are recorded, the rest of the job goes on.
+                outcome['Error'] = f'{type(e).__name__}: {e}'
+        outcome['Seconds'] = round(time.time() - start, 3)
+        return outcome
+
+    def run(self, action, tag_id, asset_ids, journal=None):
+        '''
+        > Function: generator that applies one tag action to every asset ID over the thread pool, yielding each
+                    outcome row as soon as its request completes (not in input order).
+        > Input: 'tag' or 'untag', the tag ID, an iterable of asset IDs (consumed lazily) and an optional Journal
+                 (see 'journal.py'): every outcome is appended to it as it completes, and assets it already records
+                 as done are skipped (outcome status 'skipped') instead of being sent again.
+
+        '''
+        if action not in ACTIONS:
+            raise Exception(f"Unknown tag action '{action}', expected one of {ACTIONS}")
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = set()
+            for asset_id in asset_ids:
+                unit = f'{action}:{tag_id}:{asset_id}'
+                if journal is not None and journal.done(unit): # Finished before the job was restarted.
+                    yield {'Asset ID': asset_id, 'Tag ID': tag_id, 'Action': action, 'Status': 'skipped',
+                           'HTTP Status': None, 'Error': 'Already done (journal)', 'Seconds': 0}
+                    continue
+                if len(pending) >= self.workers * QUEUE_PER_WORKER: # Waits for room before reading more IDs.
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                pending.add(executor.submit(self.journaled, journal, unit, action, tag_id, asset_id))
+            for future in wait(pending).done:
+                yield future.result()
+
+    def journaled(self, journal, unit, action, tag_id, asset_id):
+        '''
+        > Function: applies one tag action and appends its outcome to the journal (when there is one).
+
+        '''
+        outcome = self.apply(action, tag_id, asset_id)
+        if journal is not None:
+            journal.record(unit, status=outcome['Status'], outcome=outcome)
+        return outcome
+
+
+def summarize(outcomes):
+    '''
+        > Function: builds the outcome dataframe of a tag job and prints its summary (counts & the first failures).
+    '''
+    outcomes = pd.DataFrame(outcomes, columns=COLUMNS)
+    failed = outcomes[outcomes['Status'] == 'failed']
+    skipped = int((outcomes['Status'] == 'skipped').sum())
+    print(f"\n{len(outcomes) - len(failed) - skipped} of {len(outcomes) - skipped} request(s) succeeded, "
+          f"{len(failed)} failed.")
+    if skipped:
+        print(f"  {skipped} asset(s) skipped, already done by the resumed job.")
+    if len(failed):
+        for (status, error), count in failed.groupby(['HTTP Status', 'Error'], dropna=False).size().items():
+            print(f"  {count} x {'' if pd.isna(status) else f'HTTP {int(status)} - '}{error}")
+        print(f"  First failed asset IDs: {', '.join(map(str, failed['Asset ID'].head(10)))}")
+    return outcomes
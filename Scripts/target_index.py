@@ -0,0 +1,466 @@
+'''
+Copyright (c) 2022, Volkovx
+All rights reserved.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+This module indexes Nexpose site targets (inclusions & exclusions) as integer IP intervals instead of expanding every
+range into a list of IP strings. IPv4 and IPv6 ranges, CIDR blocks and single hosts all become 128-bit intervals
+(IPv4 addresses are mapped into '::ffff:0:0/96'), so both families live in one index. That block belongs to IPv4
+targets only: it is cut out of every IPv6 target (e.g. '::/0'), so IPv6 ranges never claim IPv4 addresses. Each
+site's targets are merged into sorted, disjoint intervals and its exclusions are subtracted from its inclusions. A
+sweep over all sites' intervals then splits the address space into segments, each holding the sites that cover it, so
+finding every site an IP belongs to is one binary search. Memory grows with the number of ranges, not the number of
+addresses. Non-IP targets (hostnames) are matched exactly.
+
+NumPy has no 128-bit integers, so the index arrays hold each address as a 16-byte big-endian string ('S16'), whose
+byte order sorts exactly like the number. Large IP lists are resolved in bulk: the whole list is parsed into such an
+array and matched against the segment starts with one 'searchsorted' call.
+
+The same sweep doubles as a scope report: each site's effective scope (inclusions minus exclusions) and address
+count, and every address block claimed by more than one site (duplicate scanning).
+
+A built index can be saved to one binary file ('Data/site_index.bin'): a small JSON header holding the site ID/name
+table, followed by the raw interval arrays. Later runs memory-map the file instead of calling the API again, so several
+lookup processes share the same pages and answer right after startup.
+
+__author__ = xVolkov
+__github__ = https://github.com/xVolkov
+__date__ = 10/18/2026
+__version__ = 1.0
+'''
+
+import os
+import json
+import time
+import ipaddress
+import numpy as np
+import pandas as pd
+
+INDEX_PATH = 'Data/site_index.bin' # Change to match your 'Data' directory
+MAX_AGE = 24 * 3600 # Seconds before a saved index is considered stale (same as the site targets cache TTL).
+MAGIC = b'NXSITEIX' # First bytes of a saved index file.
+FILE_VERSION = 3
+KEY_DTYPE = 'S16' # 128-bit addresses as 16-byte big-endian strings.
+MAX_ADDRESS = 2 ** 128 - 1
+IPV4_MAPPED = 0xffff << 32 # IPv4 addresses are stored as '::ffff:a.b.c.d'.
+IPV4_BLOCK = (IPV4_MAPPED, IPV4_MAPPED + 2 ** 32 - 1) # '::ffff:0:0/96', reserved for IPv4 targets.
+# Index arrays stored in the file, in file order:
+ARRAYS = ('starts_array', 'owner_offsets', 'owner_ids', 'scope_bounds', 'scope_offsets')
+
+
+def ip_to_int(ip):
+    '''
+        > Function: converts an IPv4 or IPv6 address string to a 128-bit integer (IPv4 is mapped into '::ffff:0:0/96').
+    '''
+    address = ipaddress.ip_address(ip.strip())
+    return int(address) + IPV4_MAPPED if address.version == 4 else int(address)
+
+
+def int_to_ip(number):
+    '''
+        > Function: converts a 128-bit integer back to an IP address string (dotted IPv4 for mapped addresses).
+    '''
+    if number >> 32 == 0xffff:
+        return str(ipaddress.IPv4Address(number & 0xffffffff))
+    return str(ipaddress.IPv6Address(number))
+
+
+def int_to_key(number):
+    '''
+        > Function: converts a 128-bit integer to its 16-byte big-endian index key.
+    '''
+    return number.to_bytes(16, 'big')
+
+
+def key_to_int(key):
+    '''
+        > Function: converts an index key back to an integer ('S16' values lose their trailing zero bytes).
+    '''
+    return int.from_bytes(bytes(key).ljust(16, b'\0'), 'big')
+
+
+def to_keys(numbers):
+    '''
+        > Function: converts a list of 128-bit integers to an 'S16' key array.
+    '''
+    return np.array([int_to_key(n) for n in numbers], dtype=KEY_DTYPE)
+
+
+def parse_target(target):
+    '''
+        > Function: converts a site target to an inclusive (start, end) 128-bit integer interval.
+        > Input: an 'a - b' range, a CIDR block ('10.0.0.0/8', '2001:db8::/32') or a single IPv4/IPv6 address.
+        > Output: the interval, or None if the target isn't an IP address (e.g. a hostname).
+    '''
+    try:
+        if ' - ' in target: # target is an IP range
+            start, end = target.split(' - ')
+            start, end = ipaddress.ip_address(start.strip()), ipaddress.ip_address(end.strip())
+            if start.version != end.version:
+                return None
+            start, end = ip_to_int(str(start)), ip_to_int(str(end))
+            return (min(start, end), max(start, end))
+        if '/' in target: # target is a CIDR block
+            network = ipaddress.ip_network(target.strip(), strict=False)
+            start = ip_to_int(str(network.network_address))
+            return (start, start + network.num_addresses - 1)
+        number = ip_to_int(target) # target is a single IP
+        return (number, number)
+    except ValueError:
+        return None
+
+
+def ips_to_ints(ips):
+    '''
+        > Function: parses a whole list of IPv4 address strings at once (vectorized over their bytes).
+        > Input: a list of stripped strings.
+        > Output: (uint64 array of addresses, boolean array marking which entries are valid IPv4 addresses).
+                  The addresses are plain IPv4 numbers, 'ips_to_keys' maps them into the index's key space.
+    '''
+    chars = np.array([ip if ip.isascii() else '?' for ip in ips], dtype='S16') # 16 bytes, longer strings get cut.
+    columns = chars.view(np.uint8).reshape(len(chars), 16).T.astype(np.int32) # One row per character position.
+    numbers = np.zeros(len(chars), dtype=np.uint64)
+    valid = columns[15] == 0 # Anything using the 16th byte is too long to be an IPv4 address.
+    octet = np.zeros(len(chars), dtype=np.int32) # Value of the octet being read.
+    octet_digits = np.zeros(len(chars), dtype=np.int32)
+    dots = np.zeros(len(chars), dtype=np.int32)
+    ended = np.zeros(len(chars), dtype=bool)
+    for column in columns: # Reads every string one character position at a time
+        is_digit = (column >= 48) & (column <= 57)
+        is_dot = column == 46
+        is_end = column == 0
+        valid &= (is_digit | is_dot | is_end) & ~(ended & ~is_end) # Only digits & dots, no NUL inside the string.
+        valid &= ~(is_digit & (octet_digits >= 1) & (octet == 0)) # No leading zeros, like 'ipaddress' ('010').
+        octet = np.where(is_digit, octet * 10 + column - 48, octet)
+        octet_digits += is_digit
+        closed = is_dot | (is_end & ~ended) # A dot or the end of the string closes the current octet.
+        valid &= ~closed | ((octet_digits >= 1) & (octet_digits <= 3) & (octet <= 255))
+        numbers = np.where(closed, (numbers << np.uint64(8)) | octet.astype(np.uint64), numbers)
+        octet[closed], octet_digits[closed] = 0, 0
+        dots += is_dot
+        ended |= is_end
+    valid &= dots == 3
+    return numbers, valid
+
+
+def ips_to_keys(ips):
+    '''
+        > Function: parses a whole list of address strings to index keys. IPv4 addresses are parsed in one vectorized
+                    pass, anything else is tried as an IPv6 address one by one.
+        > Output: ('S16' key array, boolean array marking which entries are valid IP addresses).
+    '''
+    numbers, valid = ips_to_ints(ips)
+    table = np.zeros((len(ips), 16), dtype=np.uint8)
+    table[:, 10:12] = 0xff # '::ffff:' prefix of IPv4-mapped addresses
+    table[:, 12:] = numbers.astype('>u4').view(np.uint8).reshape(len(ips), 4)
+    keys = table.view(KEY_DTYPE).ravel()
+    for i in np.flatnonzero(~valid): # IPv6 addresses (hostnames stay invalid)
+        if ':' in ips[i]:
+            try:
+                keys[i], valid[i] = int_to_key(ip_to_int(ips[i])), True
+            except ValueError:
+                pass
+    return keys, valid
+
+
+def merge_intervals(intervals):
+    '''
+        > Function: merges overlapping/adjacent intervals into a sorted list of disjoint intervals.
+    '''
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(included, excluded):
+    '''
+        > Function: removes excluded intervals from included ones (both sorted & disjoint), returns what is left.
+    '''
+    result = []
+    i = 0
+    for start, end in included:
+        while i < len(excluded) and excluded[i][1] < start: # Skips exclusions ending before this inclusion.
+            i += 1
+        j = i
+        while j < len(excluded) and excluded[j][0] <= end: # Cuts every exclusion overlapping this inclusion.
+            if excluded[j][0] > start:
+                result.append((start, excluded[j][0] - 1))
+            start = max(start, excluded[j][1] + 1)
+            j += 1
+        if start <= end:
+            result.append((start, end))
+    return result
+
+
+class SiteTargetIndex:
+    def __init__(self):
+        '''
+        > Function: class constructor, starts an empty index (add sites with 'add_site', then call 'build'),
+                    or use 'SiteTargetIndex.load' to map a saved index.
+
+        '''
+        self.site_names = {} # Stores {site ID : site name}.
+        self.included = {} # Stores {site ID : sorted disjoint included intervals}.
+        self.excluded = {} # Stores {site ID : sorted disjoint excluded intervals}.
+        self.hostnames = {} # Stores {site ID : (included hostnames, excluded hostnames)} for non-IP targets.
+        self.scopes = None # Stores {site ID : effective scope}, the disjoint intervals left once exclusions are removed.
+        self.built_at = None # Epoch time the index was built.
+        # Index arrays (NumPy arrays once built, read-only memory maps once loaded):
+        self.starts_array = np.zeros(0, dtype=KEY_DTYPE) # Sorted segment start addresses (keys).
+        self.owner_offsets = np.zeros(1, dtype=np.int64) # Segment i is covered by owner_ids[owner_offsets[i]:owner_offsets[i + 1]].
+        self.owner_ids = np.zeros(0, dtype=np.int64) # Site IDs covering each segment, one run per segment.
+        self.scope_bounds = np.zeros((0, 2), dtype=KEY_DTYPE) # Every site's effective scope intervals, one run per site.
+        self.scope_offsets = np.zeros(1, dtype=np.int64) # Site i's scope is scope_bounds[scope_offsets[i]:scope_offsets[i + 1]].
+
+    def add_site(self, site_id, site_name, included, excluded):
+        '''
+        > Function: adds one site's targets to the index.
+        > Input: site ID, site name and its raw included/excluded target strings (as returned by the API).
+
+        '''
+        self.site_names[site_id] = site_name
+        inc_ranges, exc_ranges, inc_names, exc_names = [], [], set(), set()
+        for targets, ranges, names in ((included, inc_ranges, inc_names), (excluded, exc_ranges, exc_names)):
+            for target in targets or []:
+                interval = parse_target(target)
+                if interval is None:
+                    names.add(target.strip().lower())
+                elif ':' in target: # IPv6 target, never covers the IPv4 block
+                    ranges.extend(subtract_intervals([interval], [IPV4_BLOCK]))
+                else:
+                    ranges.append(interval)
+        self.included[site_id] = merge_intervals(inc_ranges)
+        self.excluded[site_id] = merge_intervals(exc_ranges)
+        self.hostnames[site_id] = (inc_names, exc_names)
+
+    def build(self):
+        '''
+        > Function: subtracts each site's exclusions from its inclusions, then sweeps over every site's intervals to
+                    split the address space into segments labelled with the sites covering them.
+
+        '''
+        self.scopes = {s: subtract_intervals(self.included[s], self.excluded[s]) for s in self.site_names}
+        events = [] # (address, +1/-1, site ID)
+        for site_id, scope in self.scopes.items():
+            for start, end in scope:
+                events.append((start, 1, site_id))
+                if end < MAX_ADDRESS: # Nothing to close past the last address.
+                    events.append((end + 1, -1, site_id))
+        events.sort()
+        starts, owners = [], []
+        active = set()
+        i = 0
+        while i < len(events):
+            position = events[i][0]
+            while i < len(events) and events[i][0] == position: # Applies every event at this address.
+                if events[i][1] == 1:
+                    active.add(events[i][2])
+                else:
+                    active.discard(events[i][2])
+                i += 1
+            segment_owners = tuple(sorted(active))
+            if owners and owners[-1] == segment_owners: # Same sites as the previous segment, extends it.
+                continue
+            starts.append(position)
+            owners.append(segment_owners)
+        self.starts_array = to_keys(starts)
+        self.owner_offsets = np.cumsum([0] + [len(o) for o in owners], dtype=np.int64)
+        self.owner_ids = np.array([s for o in owners for s in o], dtype=np.int64)
+        scopes = [self.scopes[s] for s in self.site_names]
+        self.scope_bounds = to_keys([b for scope in scopes for interval in scope for b in interval]).reshape(-1, 2)
+        self.scope_offsets = np.cumsum([0] + [len(scope) for scope in scopes], dtype=np.int64)
+        self.built_at = time.time()
+
+    def owners(self, i):
+        '''
+        > Function: returns the site IDs covering segment i, as a tuple.
+
+        '''
+        return tuple(int(s) for s in self.owner_ids[self.owner_offsets[i]:self.owner_offsets[i + 1]])
+
+    def effective_scopes(self):
+        '''
+        > Function: returns {site ID : effective scope} (read back from the scope arrays of a loaded index on first use).
+
+        '''
+        if self.scopes is None:
+            self.scopes = {s: [(key_to_int(a), key_to_int(b)) for a, b in self.scope_bounds[self.scope_offsets[i]:self.scope_offsets[i + 1]]]
+                           for i, s in enumerate(self.site_names)}
+        return self.scopes
+
+    def lookup(self, target):
+        '''
+        > Function: finds every site whose targets (inclusions minus exclusions) contain an IP address or hostname.
+        > Output: a list of (site ID, site name) tuples.
+
+        '''
+        interval = parse_target(target)
+        if interval is None: # Not an IP address, matches hostname targets.
+            name = target.strip().lower()
+            return [(s, self.site_names[s]) for s, (inc, exc) in self.hostnames.items() if name in inc and name not in exc]
+        i = int(np.searchsorted(self.starts_array, int_to_key(interval[0]), side='right')) - 1
+        if i < 0:
+            return []
+        return [(s, self.site_names[s]) for s in self.owners(i)]
+
+    def segments(self):
+        '''
+        > Function: yields every (start, end, site IDs) segment of the index that at least one site covers.
+
+        '''
+        starts = [key_to_int(k) for k in self.starts_array]
+        for i in range(len(starts)):
+            if self.owner_offsets[i + 1] > self.owner_offsets[i]:
+                yield starts[i], starts[i + 1] - 1 if i + 1 < len(starts) else MAX_ADDRESS, self.owners(i)
+
+    def address_counts(self):
+        '''
+        > Function: returns {site ID : number of addresses in the site's effective scope}.
+
+        '''
+        return {s: sum(end - start + 1 for start, end in scope) for s, scope in self.effective_scopes().items()}
+
+    def overlap_report(self):
+        '''
+        > Function: lists every address block claimed by more than one site (read off the sweep's segments).
+        > Output: a dataframe with 'Start', 'End', 'Addresses', 'Site IDs' and 'Site Names' columns.
+
+        '''
+        rows = [{'Start': int_to_ip(start), 'End': int_to_ip(end), 'Addresses': end - start + 1, 'Site IDs': list(owners),
+                 'Site Names': [self.site_names[s] for s in owners]}
+                for start, end, owners in self.segments() if len(owners) > 1]
+        return pd.DataFrame(rows, columns=['Start', 'End', 'Addresses', 'Site IDs', 'Site Names'])
+
+    def scope_report(self):
+        '''
+        > Function: summarizes each site's effective scope.
+        > Output: a dataframe with 'Site ID', 'Site Name', 'Effective Ranges' (list of 'a - b' strings),
+                  'Effective Addresses' and 'Overlapping Addresses' (addresses other sites also claim) columns.
+
+        '''
+        shared = dict.fromkeys(self.site_names, 0)
+        for start, end, owners in self.segments():
+            if len(owners) > 1:
+                for s in owners:
+                    shared[s] += end - start + 1
+        counts = self.address_counts()
+        rows = [{'Site ID': s, 'Site Name': name,
+                 'Effective Ranges': [f'{int_to_ip(a)} - {int_to_ip(b)}' if a != b else int_to_ip(a) for a, b in self.effective_scopes()[s]],
+                 'Effective Addresses': counts[s], 'Overlapping Addresses': shared[s]}
+                for s, name in self.site_names.items()]
+        return pd.DataFrame(rows, columns=['Site ID', 'Site Name', 'Effective Ranges', 'Effective Addresses',
+                                           'Overlapping Addresses']).sort_values(by=['Site ID'], ignore_index=True)
+
+    def resolve_many(self, ips):
+        '''
+        > Function: finds the sites of a whole list of IP addresses in one vectorized pass.
+        > Input: an iterable of IP address (or hostname) strings.
+        > Output: a dataframe with 'IP', 'Site IDs' and 'Site Names' columns (lists, empty when nothing matched).
+        '''
+        ips = [str(ip).strip() for ip in ips]
+        keys, valid = ips_to_keys(ips)
+        segments = np.searchsorted(self.starts_array, keys, side='right') - 1 # One pass over all IPs.
+        segments[(segments < 0) | ~valid] = -1 # Misses (and non-IPs) get no sites for now.
+        hit, positions = np.unique(segments, return_inverse=True) # Builds each segment's site lists once.
+        hit_ids = np.empty(len(hit), dtype=object)
+        hit_ids[:] = [list(self.owners(i)) if i >= 0 else [] for i in hit]
+        hit_names = np.empty(len(hit), dtype=object)
+        hit_names[:] = [[self.site_names[s] for s in ids] for ids in hit_ids]
+        site_ids, site_names = hit_ids[positions.ravel()], hit_names[positions.ravel()]
+        for i in np.flatnonzero(~valid): # Hostnames (and anything else that isn't an IP address) one by one.
+            matches = self.lookup(ips[i]) if ips[i] else []
+            site_ids[i], site_names[i] = [s for s, _ in matches], [n for _, n in matches]
+        return pd.DataFrame({'IP': ips, 'Site IDs': site_ids, 'Site Names': site_names})
+
+    def save(self, path=INDEX_PATH):
+        '''
+        > Function: writes the built index to one binary file: a JSON header (site ID/name table, hostnames, build
+                    time, array layout) followed by the raw index arrays, each 8-byte aligned so they can be mapped.
+                    The file is written next to the target and renamed over it, so readers never see a partial index.
+
+        '''
+        arrays = [np.ascontiguousarray(getattr(self, name)) for name in ARRAYS]
+        layout, offset = [], 0
+        for name, array in zip(ARRAYS, arrays):
+            layout.append({'name': name, 'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset})
+            offset += -(-array.nbytes // 8) * 8 # Rounded up to a multiple of 8 bytes.
+        header = json.dumps({'version': FILE_VERSION, 'built_at': self.built_at,
+                             'sites': [[s, name] for s, name in self.site_names.items()],
+                             'hostnames': [[s, sorted(inc), sorted(exc)] for s, (inc, exc) in self.hostnames.items()],
+                             'arrays': layout}).encode()
+        header += b' ' * (-(len(MAGIC) + 8 + len(header)) % 8) # Pads the header so the arrays start 8-byte aligned.
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(MAGIC + np.uint64(len(header)).tobytes() + header)
+            for array in arrays:
+                f.write(array.tobytes())
+                f.write(b'\0' * (-array.nbytes % 8))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        '''
+        > Function: opens a saved index, memory-mapping its arrays read-only (several processes share the same pages).
+        > Output: the index, or None if the file is missing or isn't a readable index.
+
+        '''
+        if not os.path.isfile(path):
+            return None
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            length = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+            header = json.loads(f.read(length))
+        if header.get('version') != FILE_VERSION:
+            return None
+        index = cls()
+        index.built_at = header['built_at']
+        index.site_names = {s: name for s, name in header['sites']}
+        index.hostnames = {s: (set(inc), set(exc)) for s, inc, exc in header['hostnames']}
+        data_offset = len(MAGIC) + 8 + length
+        for entry in header['arrays']:
+            shape = tuple(entry['shape'])
+            if np.prod(shape) == 0: # Empty arrays can't be mapped.
+                array = np.zeros(shape, dtype=entry['dtype'])
+            else:
+                array = np.memmap(path, dtype=entry['dtype'], mode='r', offset=data_offset + entry['offset'], shape=shape)
+            setattr(index, entry['name'], array)
+        return index
+
+    def is_stale(self, max_age=MAX_AGE):
+        '''
+        > Function: checks whether the index is older than 'max_age' seconds.
+
+        '''
+        return self.built_at is None or time.time() - self.built_at > max_age
+
+
+def load_index(path=INDEX_PATH, max_age=MAX_AGE):
+    '''
+        > Function: returns the saved index if it exists and isn't stale, else None (the caller rebuilds it from the API).
+    '''
+    index = SiteTargetIndex.load(path)
+    if index is None or index.is_stale(max_age):
+        return None
+    return index
+
+
+def write_results(results, path, output_format='csv'):
+    '''
+        > Function: writes a results dataframe ('resolve_many', 'overlap_report' or 'scope_report') to one file.
+        > Input: the dataframe, output file path and format ('csv' joins list columns with '; ', 'jsonl' keeps lists).
+    '''
+    if output_format == 'jsonl':
+        results.to_json(path, orient='records', lines=True)
+    else:
+        list_columns = [c for c in results.columns if results[c].map(lambda v: isinstance(v, list)).any()]
+        results = results.assign(**{c: results[c].map(lambda v: '; '.join(map(str, v))) for c in list_columns})
+        results.to_csv(path, index=False)
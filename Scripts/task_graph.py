@@ -0,0 +1,100 @@
+'''
+Copyright (c) 2022, Volkovx
+All rights reserved.
+
+This source code is licensed under the BSD-style license found in the
+LICENSE file in the root directory of this source tree.
+
+This module runs a small dependency graph of tasks (e.g. the API collectors of 'api_calls.Main') on a thread pool.
+A task starts as soon as all the tasks it depends on have finished, a failed task only skips the tasks that depend on
+it, and every task's run time is recorded so it can be reported once the whole graph is done.
+
+__author__ = xVolkov
+__github__ = https://github.com/xVolkov
+__date__ = 10/18/2026
+__version__ = 1.0
+'''
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from timeit import default_timer as timer
+
+
+class TaskGraph:
+    def __init__(self, workers=None):
+        '''
+        > Function: class constructor.
+        > Input: max number of tasks running at once (defaults to the number of tasks in the graph).
+
+        '''
+        self.workers = workers
+        self.tasks = {} # Stores {task name : (function, [names of tasks it depends on])}.
+        self.status = {} # Stores {task name : 'done' | 'failed' | 'skipped'}.
+        self.timings = {} # Stores {task name : run time in seconds}.
+        self.errors = {} # Stores {task name : exception raised by the task}.
+
+    def add(self, name, func, depends_on=()):
+        '''
+        > Function: adds a task to the graph.
+        > Input: a unique task name, a function taking no arguments and the names of the tasks it depends on.
+
+        '''
+        if name in self.tasks:
+            raise Exception(f'Task "{name}" was already added to the graph.')
+        for dep in depends_on:
+            if dep not in self.tasks:
+                raise Exception(f'Task "{name}" depends on unknown task "{dep}". Add "{dep}" first.')
+        self.tasks[name] = (func, list(depends_on))
+
+    def _run_task(self, name):
+        '''
+        > Function: runs one task and records how long it took.
+
+        '''
+        start = timer()
+        try:
+            self.tasks[name][0]()
+        finally:
+            self.timings[name] = timer() - start
+
+    def run(self):
+        '''
+        > Function: runs every task once its dependencies are done and waits for the whole graph to finish.
+        > Output: the {task name : status} dict.
+
+        '''
+        pending = dict(self.tasks)
+        running = {} # Stores {future : task name}.
+        with ThreadPoolExecutor(max_workers=self.workers or max(1, len(self.tasks))) as executor:
+            while pending or running:
+                for name, (func, deps) in list(pending.items()):
+                    if any(self.status.get(dep) in ('failed', 'skipped') for dep in deps):
+                        self.status[name] = 'skipped' # An input is missing, there is nothing to run on.
+                        del pending[name]
+                    elif all(self.status.get(dep) == 'done' for dep in deps):
+                        running[executor.submit(self._run_task, name)] = name
+                        del pending[name]
+                if not running:
+                    continue # Only skipped tasks were resolved this round, re-checks what is left.
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    if future.exception() is None:
+                        self.status[name] = 'done'
+                    else:
+                        self.status[name] = 'failed'
+                        self.errors[name] = future.exception()
+        return self.status
+
+    def report(self):
+        '''
+        > Function: prints every task's status and run time.
+
+        '''
+        print('\nTask timings:')
+        for name in self.tasks:
+            status = self.status.get(name, 'pending')
+            seconds = f"{self.timings[name]:.2f}s" if name in self.timings else '-'
+            line = f"  > {name}: {status} ({seconds})"
+            if name in self.errors:
+                line += f" - {type(self.errors[name]).__name__}: {self.errors[name]}"
+            print(line)
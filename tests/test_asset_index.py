@@ -0,0 +1,54 @@
+import random
+import numpy as np
+import pandas as pd
+from asset_index import HostnameIndex, load_assets
+
+
+def levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y)))
+        previous = current
+    return previous[-1]
+
+
+def random_names(rng, count):
+    return [''.join(rng.choice('ab-1') for _ in range(rng.randint(1, 7))) for _ in range(count)]
+
+
+def test_hostname_index_matches_str_operations():
+    rng = random.Random(3)
+    names = sorted(set(random_names(rng, 300)))
+    index = HostnameIndex(np.array(names))
+    for query in random_names(rng, 300):
+        assert index.exact(query).tolist() == [i for i, n in enumerate(names) if n == query]
+        assert index.prefix(query).tolist() == [i for i, n in enumerate(names) if n.startswith(query)]
+        assert sorted(index.substring(query).tolist()) == [i for i, n in enumerate(names) if query in n]
+
+
+def write_export(path, host_names):
+    pd.DataFrame({'asset_id': range(1, len(host_names) + 1), 'host_name': host_names,
+                  'ip_address_all': [f'10.0.{i // 256}.{i % 256}' for i in range(len(host_names))]}).to_csv(path, index=False)
+
+
+def test_find_similar_matches_brute_force(tmp_path):
+    rng = random.Random(4)
+    names = random_names(rng, 400)
+    write_export(tmp_path / 'All_Assets.csv', names)
+    index = load_assets(str(tmp_path / 'All_Assets.csv'))
+    for query in random_names(rng, 100):
+        found = index.find_similar(query, max_distance=2, limit=len(names))
+        expected = {n: levenshtein(query, n) for n in set(names) if levenshtein(query, n) <= 2}
+        assert dict(zip(found['host_name'], found['Edit Distance'])) == expected
+        assert found['Edit Distance'].is_monotonic_increasing
+
+
+def test_missing_host_names_keep_names_sorted(tmp_path):
+    write_export(tmp_path / 'All_Assets.csv', ['web01.corp.local', None, 'ABC', None, 'zed'])
+    index = load_assets(str(tmp_path / 'All_Assets.csv'))
+    assert np.all(index.unique_names[:-1] <= index.unique_names[1:])
+    assert index.find_hostname('web01')['asset_id'].tolist() == [1]
+    assert index.find_hostname('zed')['asset_id'].tolist() == [5]
+    assert len(index.find_hostname('', 'prefix')) == 3 # Assets without a host name never match
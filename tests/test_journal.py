@@ -0,0 +1,44 @@
+from journal import Journal, journal_path
+
+
+def test_resume_skips_done_units(tmp_path):
+    path = str(tmp_path / 'job.jsonl')
+    with Journal(path) as journal:
+        journal.record('site:1', result={'ids': {3, 1}})
+        journal.record('site:2', status='failed')
+    journal = Journal(path, resume=True)
+    assert journal.resumed == 2
+    assert journal.done('site:1') and not journal.done('site:2') # Failed units are redone
+    assert journal.result('site:1') == {'ids': {1, 3}}
+    journal.close()
+    assert Journal(path).resumed == 0 # Without resume the journal starts over
+
+
+def test_truncated_line_is_redone(tmp_path):
+    path = str(tmp_path / 'job.jsonl')
+    with Journal(path) as journal:
+        journal.record('a')
+        journal.record('b')
+    with open(path) as f:
+        content = f.read()
+    with open(path, 'w') as f:
+        f.write(content[:-10]) # The crash cut the last line short
+    with Journal(path, resume=True) as journal:
+        assert journal.done('a') and not journal.done('b')
+        journal.record('b')
+    with Journal(path, resume=True) as journal:
+        assert journal.done('b')
+
+
+def test_completed_journal_starts_over(tmp_path):
+    path = str(tmp_path / 'job.jsonl')
+    journal = Journal(path)
+    journal.record('a')
+    journal.complete()
+    with Journal(path, resume=True) as journal:
+        assert journal.resumed == 0 and not journal.done('a')
+
+
+def test_journal_path_depends_on_inputs():
+    assert journal_path('tag', 1, 'add', 'a.txt') == journal_path('tag', 1, 'add', 'a.txt')
+    assert journal_path('tag', 1, 'add', 'a.txt') != journal_path('tag', 1, 'exact', 'a.txt')
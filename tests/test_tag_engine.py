@@ -0,0 +1,24 @@
+import pytest
+from tag_engine import plan_sync
+
+CURRENT = {1: {'tag'}, 2: {'criteria'}, 3: {'tag', 'criteria'}, 5: {'tag'}} # Stores {asset ID : sources}
+
+
+def test_plan_sync_add():
+    plan = plan_sync(CURRENT, ['1', '4', 'x', ''], 'add')
+    assert plan == {'tag': [4], 'untag': [], 'unchanged': 1, 'criteria': [], 'invalid': ['x', '']}
+
+
+def test_plan_sync_remove():
+    plan = plan_sync(CURRENT, ['1', '2', '4'], 'remove')
+    assert plan == {'tag': [], 'untag': [1], 'unchanged': 1, 'criteria': [2], 'invalid': []}
+
+
+def test_plan_sync_exact():
+    plan = plan_sync(CURRENT, ['1', '4'], 'exact')
+    assert plan == {'tag': [4], 'untag': [3, 5], 'unchanged': 1, 'criteria': [2], 'invalid': []}
+
+
+def test_plan_sync_rejects_unknown_modes():
+    with pytest.raises(Exception, match='Unknown sync mode'):
+        plan_sync(CURRENT, ['1'], 'replace')
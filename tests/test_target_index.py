@@ -0,0 +1,80 @@
+import random
+import ipaddress
+from target_index import ips_to_ints, ips_to_keys, key_to_int, merge_intervals, subtract_intervals, IPV4_MAPPED
+
+
+def random_ipv4_string(rng):
+    octets = rng.choice([3, 4, 4, 4, 5])
+    parts = [rng.choice(['0', '7', '10', '99', '255', '256', '999', '00', '01', '010', '0255', '', 'a'])
+             for _ in range(octets)]
+    return '.'.join(parts)
+
+
+def test_ips_to_ints_matches_ipaddress():
+    rng = random.Random(0)
+    ips = [random_ipv4_string(rng) for _ in range(5000)]
+    ips += ['0.0.0.0', '255.255.255.255', '010.0.0.1', '1.2.3.04', '00.1.1.1', '1.2.3.4.', '.1.2.3', '1..2.3',
+            '1.2.3.4x', '', '1.2.3', '123.123.123.1234', '::1', 'host.corp.local', 'é.1.1.1']
+    numbers, valid = ips_to_ints(ips)
+    for ip, number, ok in zip(ips, numbers, valid):
+        try:
+            expected = int(ipaddress.IPv4Address(ip))
+        except ValueError:
+            expected = None
+        assert ok == (expected is not None), ip
+        if ok:
+            assert int(number) == expected, ip
+
+
+def test_ips_to_keys_maps_ipv4_and_parses_ipv6():
+    keys, valid = ips_to_keys(['10.0.0.5', '::1', '2001:db8::1', 'web01', '010.0.0.5'])
+    assert valid.tolist() == [True, True, True, False, False]
+    assert key_to_int(keys[0]) == IPV4_MAPPED + int(ipaddress.IPv4Address('10.0.0.5'))
+    assert key_to_int(keys[1]) == 1
+    assert key_to_int(keys[2]) == int(ipaddress.IPv6Address('2001:db8::1'))
+
+
+def random_intervals(rng, count, limit=40):
+    intervals = []
+    for _ in range(count):
+        start = rng.randint(0, limit)
+        intervals.append((start, start + rng.randint(0, 6)))
+    return intervals
+
+
+def covered(intervals):
+    return {n for start, end in intervals for n in range(start, end + 1)}
+
+
+def as_intervals(numbers):
+    '''
+        > Function: brute-force merge, turns a set of integers into sorted disjoint (maximal) intervals.
+    '''
+    intervals = []
+    for n in sorted(numbers):
+        if intervals and n == intervals[-1][1] + 1:
+            intervals[-1] = (intervals[-1][0], n)
+        else:
+            intervals.append((n, n))
+    return intervals
+
+
+def test_merge_intervals_matches_brute_force():
+    rng = random.Random(1)
+    for _ in range(2000):
+        intervals = random_intervals(rng, rng.randint(0, 6))
+        assert merge_intervals(intervals) == as_intervals(covered(intervals))
+    assert merge_intervals([(5, 9), (1, 4)]) == [(1, 9)] # Adjacent intervals are merged
+    assert merge_intervals([(1, 3), (5, 6)]) == [(1, 3), (5, 6)]
+
+
+def test_subtract_intervals_matches_brute_force():
+    rng = random.Random(2)
+    for _ in range(2000):
+        included = merge_intervals(random_intervals(rng, rng.randint(0, 5)))
+        excluded = merge_intervals(random_intervals(rng, rng.randint(0, 5)))
+        result = subtract_intervals(included, excluded)
+        assert result == as_intervals(covered(included) - covered(excluded))
+    assert subtract_intervals([(0, 10)], [(0, 10)]) == []
+    assert subtract_intervals([(0, 10)], [(3, 3)]) == [(0, 2), (4, 10)]
+    assert subtract_intervals([(0, 10)], [(11, 20)]) == [(0, 10)]